@@ -6,6 +6,7 @@ The particular realisation used in the paper is data/lm_ieks_coord_turn_states.c
 """
 
 from enum import Enum
+from functools import lru_cache
 from typing import Optional, Tuple, Union
 import logging
 from pathlib import Path
@@ -82,26 +83,26 @@ def get_specific_states_from_file(
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     states_file = data_root / "states.csv"
     if states_file.exists():
-        states = np.genfromtxt(states_file, dtype=float, delimiter=";", comments="#")
+        states = _read_csv(states_file)
     else:
         raise FileNotFoundError(f"No states data file at '{states_file}'")
 
     meas_file = data_root / "meas.csv"
     if meas_file.exists():
-        measurements = np.genfromtxt(meas_file, dtype=float, delimiter=";", comments="#")
+        measurements = _read_csv(meas_file)
     else:
         raise FileNotFoundError(f"No meas data file at '{meas_file}'")
 
     xf_file = data_root / type_.value / _xf_name(num_iter)
     if xf_file.exists():
-        xf = np.genfromtxt(xf_file, dtype=float, delimiter=";", comments="#")
+        xf = _read_csv(xf_file)
     else:
         LOGGER.warn(f"No xf data file at '{xf_file}'")
         xf = None
 
     xs_file = data_root / type_.value / _xs_name(num_iter)
     if xs_file.exists():
-        xs = np.genfromtxt(xs_file, dtype=float, delimiter=";", comments="#")
+        xs = _read_csv(xs_file)
     else:
         LOGGER.warn(f"No xs data file at '{xs_file}'")
         xs = None
@@ -109,6 +110,21 @@ def get_specific_states_from_file(
     return states, measurements, xf, xs
 
 
+def _read_csv(file_: Path) -> np.ndarray:
+    """Read a reference data file
+
+    The parsing is cached, since the same files are read by several tests and experiments in one process.
+    Returns a copy, so that the callers can modify the array.
+    """
+    return _parse_csv(file_.resolve()).copy()
+
+
+@lru_cache(maxsize=None)
+def _parse_csv(file_: Path) -> np.ndarray:
+    # The reference files are complete (no empty fields), so the faster `loadtxt` parser suffices.
+    return np.loadtxt(file_, dtype=float, delimiter=";", comments="#")
+
+
 def save_states_and_meas(states, meas, dir_, label):
     states_file = dir_ / f"{label}_states.csv"
     meas_file = dir_ / f"{label}_meas.csv"
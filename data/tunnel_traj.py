@@ -1,5 +1,4 @@
 from pathlib import Path
-from functools import partial
 import numpy as np
 from scipy.stats import multivariate_normal as mvn
 from src.models.coord_turn import CoordTurn
@@ -50,5 +49,5 @@ if __name__ == "__main__":
     range_ = (0, None)
     tunnel_segment = [145, 165]
     states, measurements = get_states_and_meas(meas_model, R, range_, tunnel_segment)
-    cartes_meas = np.apply_along_axis(partial(to_cartesian_coords, pos=pos), 1, measurements)
+    cartes_meas = to_cartesian_coords(measurements, pos)
     tikz_2d_tab_to_file([("states", states), ("meas", cartes_meas)], Path("../paper/fig/tunnel_sim/"))
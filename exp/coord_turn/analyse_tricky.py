@@ -24,7 +24,7 @@ from src.utils import setup_logger
 from src.analytics import rmse
 from src.visualization import to_tikz, write_to_tikz_file, plot_scalar_metric
 from src.models.range_bearing import MultiSensorRange, MultiSensorBearings
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file, simulate_data
 from exp.coord_turn.common import (
     MeasType,
@@ -45,15 +45,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -154,9 +146,9 @@ def main():
     #     slr_smoothing_cost_means,
     #     measurements=measurements,
     #     m_1_0=prior_mean,
-    #     P_1_0_inv=np.linalg.inv(prior_cov),
-    #     motion_fn=motion_model.map_set,
-    #     meas_fn=meas_model.map_set,
+    #     P_1_0_chol=cho_factor(prior_cov),
+    #     motion_fn=motion_model.map_set_batch,
+    #     meas_fn=meas_model.map_set_batch,
     #     slr_method=SigmaPointSlr(sigma_point_method),
     # )
 
@@ -164,7 +156,7 @@ def main():
     #     slr_smoothing_cost_pre_comp,
     #     measurements=measurements,
     #     m_1_0=prior_mean,
-    #     P_1_0_inv=np.linalg.inv(prior_cov),
+    #     P_1_0_chol=cho_factor(prior_cov),
     # )
     # ms_ipls, Ps_ipls, cost_ipls, rmses_ipls, neeses_ipls = run_smoothing(
     #     SigmaPointIpls(motion_model, meas_model, sigma_point_method, num_iter),
@@ -8,6 +8,7 @@ import logging
 from functools import partial
 from copy import deepcopy
 import numpy as np
+from scipy.linalg import cho_factor
 from pathlib import Path
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
@@ -18,7 +19,7 @@ from src.smoother.slr.lm_ipls import SigmaPointLmIpls
 from src.smoother.slr.ls_ipls import SigmaPointLsIpls
 from src.utils import setup_logger, tikz_err_bar_tab_format, tikz_stats, save_stats
 from src.models.range_bearing import MultiSensorBearings, MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from src.slr.sigma_points import SigmaPointSlr
 from src.sigma_points import SphericalCubature
 from src.line_search import ArmijoWolfeLineSearch
@@ -44,15 +45,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -153,7 +146,7 @@ def main():
 
         sigma_point_method = SphericalCubature()
         cost_fn_ipls = partial(
-            slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_inv=np.linalg.inv(prior_cov)
+            slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_chol=cho_factor(prior_cov)
         )
 
         ms_ipls, Ps_ipls, cost_ipls, tmp_rmse, tmp_nees = run_smoothing(
@@ -197,9 +190,9 @@ def main():
         #     slr_smoothing_cost_means,
         #     measurements=measurements,
         #     m_1_0=prior_mean,
-        #     P_1_0_inv=np.linalg.inv(prior_cov),
-        #     motion_fn=motion_model.map_set,
-        #     meas_fn=meas_model.map_set,
+        #     P_1_0_chol=cho_factor(prior_cov),
+        #     motion_fn=motion_model.map_set_batch,
+        #     meas_fn=meas_model.map_set_batch,
         #     slr_method=SigmaPointSlr(sigma_point_method),
         # )
         # ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls, tmp_rmse, tmp_nees = run_smoothing(
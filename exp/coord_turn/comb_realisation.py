@@ -19,6 +19,7 @@ from pathlib import Path
 from functools import partial
 from copy import deepcopy
 import numpy as np
+from scipy.linalg import cho_factor
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
@@ -34,7 +35,7 @@ from src.cost_fn.slr import slr_smoothing_cost_pre_comp, slr_smoothing_cost_mean
 from src.utils import setup_logger, tikz_2d_traj
 from src.visualization import to_tikz, write_to_tikz_file
 from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file, simulate_data
 from exp.coord_turn.common import MeasType, run_smoothing, plot_results, modify_meas
 
@@ -51,15 +52,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -132,7 +125,7 @@ def main():
     sigma_point_method = SphericalCubature()
 
     cost_fn_ipls = partial(
-        slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_inv=np.linalg.inv(prior_cov)
+        slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_chol=cho_factor(prior_cov)
     )
 
     # log.info("Running IPLS...")
@@ -29,16 +29,14 @@ def run_smoothing(smoother, states, measurements, prior_mean, prior_cov, cost_fn
         )
         stored_est = smoother.stored_estimates()
         next(stored_est)
-        stored_est = list(stored_est)
     else:
         _, _, ms, Ps, iter_cost = smoother.filter_and_smooth(measurements, prior_mean, prior_cov, cost_fn)
-        stored_est = list(smoother.stored_estimates())
-    rmses = calc_iter_metrics(
-        lambda means, covs, states: rmse(means[:, :-1], states), stored_est, states, smoother.num_iter
-    )
-    # assert np.allclose(ms_st, ms)
-    neeses = calc_iter_metrics(
-        lambda means, covs, states: np.mean(nees(states, means[:, :-1], covs[:, :-1, :-1])),
+        stored_est = smoother.stored_estimates()
+    rmses, neeses = calc_iter_metrics_multi(
+        (
+            lambda means, covs, states: rmse(means[:, :-1], states),
+            lambda means, covs, states: np.mean(nees(states, means[:, :-1], covs[:, :-1, :-1])),
+        ),
         stored_est,
         states,
         smoother.num_iter,
@@ -47,17 +45,25 @@ def run_smoothing(smoother, states, measurements, prior_mean, prior_cov, cost_fn
 
 
 def calc_iter_metrics(metric_fn, estimates, states, num_iter):
-    metrics = np.array([metric_fn(means, covs, states) for means, covs in estimates])
-    if len(metrics) < num_iter:
-        metrics = np.concatenate(
-            (
-                metrics,
-                metrics[-1]
-                * np.ones(
-                    num_iter - len(metrics),
-                ),
-            )
-        )
+    return calc_iter_metrics_multi((metric_fn,), estimates, states, num_iter)[0]
+
+
+def calc_iter_metrics_multi(metric_fns, estimates, states, num_iter):
+    """Calculate several metrics in a single pass over the estimates
+
+    Args:
+        metric_fns: sequence of fns (means, covs, states) -> scalar
+        estimates: iterable of (means, covs), e.g. the generator `smoother.stored_estimates()`.
+        states (K, D_x): true states
+        num_iter: Metrics are padded with the last value if there are fewer estimates than `num_iter`
+
+    Returns:
+        metrics (num_metrics, num_iter)
+    """
+    metrics = np.array([[metric_fn(means, covs, states) for metric_fn in metric_fns] for means, covs in estimates]).T
+    num_est = metrics.shape[1]
+    if num_est < num_iter:
+        metrics = np.concatenate((metrics, np.repeat(metrics[:, -1:], num_iter - num_est, axis=1)), axis=1)
     return metrics
 
 
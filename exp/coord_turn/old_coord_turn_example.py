@@ -44,7 +44,7 @@ def main():
     # Generate data
     true_states, measurements = get_tricky_data(meas_model, R, range_)
     obs_dims = true_states.shape[1]
-    cartes_meas = np.apply_along_axis(partial(to_cartesian_coords, pos=pos), 1, measurements)
+    cartes_meas = to_cartesian_coords(measurements, pos)
 
     # Prior distr.
     prior_mean = np.array([4.4, 0, 4, 0, 0])
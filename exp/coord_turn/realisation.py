@@ -18,6 +18,7 @@ import argparse
 from pathlib import Path
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
@@ -33,7 +34,7 @@ from src.cost_fn.slr import slr_smoothing_cost_pre_comp, slr_smoothing_cost_mean
 from src.utils import setup_logger, tikz_2d_traj
 from src.visualization import to_tikz, write_to_tikz_file
 from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file, simulate_data
 from exp.coord_turn.common import MeasType, run_smoothing, plot_results, modify_meas
 
@@ -50,15 +51,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -171,7 +164,7 @@ def main():
     sigma_point_method = SphericalCubature()
 
     cost_fn_ipls = partial(
-        slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_inv=np.linalg.inv(prior_cov)
+        slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_chol=cho_factor(prior_cov)
     )
 
     log.info("Running IPLS...")
@@ -208,9 +201,9 @@ def main():
         slr_smoothing_cost_means,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
-        motion_fn=motion_model.map_set,
-        meas_fn=meas_model.map_set,
+        P_1_0_chol=cho_factor(prior_cov),
+        motion_fn=motion_model.map_set_batch,
+        meas_fn=meas_model.map_set_batch,
         slr_method=SigmaPointSlr(sigma_point_method),
     )
 
@@ -230,6 +223,8 @@ def main():
         (ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls, "LS-IPLS"),
     )
 
+    if args.no_plot:
+        return
     for ms, _, _, label in results:
         tikz_2d_traj(Path.cwd() / "tikz", ms[:, :2], label)
     plot_results(
@@ -253,6 +248,7 @@ def parse_args():
     parser.add_argument("--var_sensors", action="store_true")
     parser.add_argument("--meas_type", type=MeasType, required=True)
     parser.add_argument("--num_iter", type=int, default=10)
+    parser.add_argument("--no_plot", action="store_true", help="Only run the smoothers, e.g. when profiling")
 
     return parser.parse_args()
 
@@ -5,6 +5,7 @@ import argparse
 from pathlib import Path
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
 from src.smoother.ext.ls_ieks import LsIeks
@@ -19,7 +20,7 @@ from src.cost_fn.slr import slr_smoothing_cost_pre_comp, slr_smoothing_cost_mean
 from src.utils import setup_logger, save_stats
 from src.visualization import plot_scalar_metric_err_bar
 from src.models.range_bearing import BearingsVaryingSensors, MultiSensorBearings
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file, simulate_data
 from exp.coord_turn.common import run_smoothing, modify_meas
 
@@ -40,15 +41,7 @@ def main():
     prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
     D_x = prior_mean.shape[0]
     K = 500
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -164,7 +157,7 @@ def main():
 
         sigma_point_method = SphericalCubature()
         cost_fn_ipls = partial(
-            slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_inv=np.linalg.inv(prior_cov)
+            slr_smoothing_cost_pre_comp, measurements=measurements, m_1_0=prior_mean, P_1_0_chol=cho_factor(prior_cov)
         )
 
         ms_ipls, Ps_ipls, cost_ipls, tmp_rmse, tmp_nees = run_smoothing(
@@ -197,9 +190,9 @@ def main():
             slr_smoothing_cost_means,
             measurements=measurements,
             m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
-            motion_fn=motion_model.map_set,
-            meas_fn=meas_model.map_set,
+            P_1_0_chol=cho_factor(prior_cov),
+            motion_fn=motion_model.map_set_batch,
+            meas_fn=meas_model.map_set_batch,
             slr_method=SigmaPointSlr(sigma_point_method),
         )
         ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls, tmp_rmse, tmp_nees = run_smoothing(
@@ -10,6 +10,7 @@ from enum import Enum
 import logging
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 from src import visualization as vis
 from src.utils import setup_logger
 from src.models.nonstationary_growth import NonStationaryGrowth
@@ -94,7 +95,7 @@ def main():
         slr_smoothing_cost_pre_comp,
         measurements=meas,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
+        P_1_0_chol=cho_factor(prior_cov),
     )
 
     ipls = SigmaPointIpls(motion_model, meas_model, sigma_point_method, args.num_iter)
@@ -1,12 +1,14 @@
 """Timings of smoother methods"""
 
-from timeit import timeit
+import gc
+from time import perf_counter
 from functools import partial
 import argparse
 import logging
 from pathlib import Path
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
 from src.smoother.ext.ls_ieks import LsIeks
@@ -21,10 +23,15 @@ from src.cost_fn.slr import (
     slr_smoothing_cost_means,
     slr_noop_cost,
 )
-from src.cost_fn.ext import analytical_smoothing_cost, dir_der_analytical_smoothing_cost, noop_cost
+from src.cost_fn.ext import (
+    analytical_smoothing_cost,
+    dir_der_analytical_smoothing_cost,
+    noop_cost,
+    NoiseFactorCache,
+)
 from src.utils import setup_logger
 from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file
 
 
@@ -38,15 +45,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -62,11 +61,13 @@ def main():
     np.random.seed(0)
     _, all_meas, _, xs_ss = get_specific_states_from_file(Path.cwd() / "data/lm_ieks_paper", Type.LM, num_iter)
     K = all_meas.shape[0]
-    covs = np.array([prior_cov] * K) * (0.90 + np.random.rand() / 5)
+    # Read-only view, the smoothers copy the initial trajectory.
+    covs = np.broadcast_to(prior_cov * (0.90 + np.random.rand() / 5), (K, *prior_cov.shape))
 
     meas_model = MultiSensorRange(sensors, R)
     measurements = all_meas[:, :2]
 
+    noise_factors = NoiseFactorCache(motion_model, meas_model, prior_cov)
     cost_fn_eks = partial(
         analytical_smoothing_cost,
         measurements=measurements,
@@ -74,6 +75,7 @@ def main():
         P_1_0=prior_cov,
         motion_model=motion_model,
         meas_model=meas_model,
+        noise_factors=noise_factors,
     )
 
     dir_der_eks = partial(
@@ -83,6 +85,7 @@ def main():
         P_1_0=prior_cov,
         motion_model=motion_model,
         meas_model=meas_model,
+        noise_factors=noise_factors,
     )
 
     sigma_point_method = SphericalCubature()
@@ -91,7 +94,7 @@ def main():
         slr_smoothing_cost_pre_comp,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
+        P_1_0_chol=cho_factor(prior_cov),
     )
     time_ieks = partial(
         Ieks(motion_model, meas_model, num_iter).filter_and_smooth_with_init_traj,
@@ -152,9 +155,9 @@ def main():
         slr_smoothing_cost_means,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
-        motion_fn=motion_model.map_set,
-        meas_fn=meas_model.map_set,
+        P_1_0_chol=cho_factor(prior_cov),
+        motion_fn=motion_model.map_set_batch,
+        meas_fn=meas_model.map_set_batch,
         slr_method=SigmaPointSlr(sigma_point_method),
     )
     time_ls_ipls = partial(
@@ -169,18 +172,52 @@ def main():
         cost_fn_ls_ipls,
     )
     num_trials = args.num_trials
-    time_ieks = timeit(time_ieks, number=num_trials) / (num_iter * num_trials)
-    time_lm_ieks = timeit(time_lm_ieks, number=num_trials) / (num_iter * num_trials)
-    time_ls_ieks = timeit(time_ls_ieks, number=num_trials) / (num_iter * num_trials)
-    time_ipls = timeit(time_ipls, number=num_trials) / (num_iter * num_trials)
-    time_lm_ipls = timeit(time_lm_ipls, number=num_trials) / (num_iter * num_trials)
-    time_ls_ipls = timeit(time_ls_ipls, number=num_trials) / (num_iter * num_trials)
-    print(f"IEKS: {time_ieks:.2f} s, 100.0%")
-    print(f"LM-IEKS: {time_lm_ieks:.2f} s, {time_lm_ieks/time_ieks*100:.2f}%")
-    print(f"LS-IEKS: {time_ls_ieks:.2f} s, {time_ls_ieks/time_ieks*100:.2f}%")
-    print(f"IPLS: {time_ipls:.2f} s, {time_ipls/time_ieks*100:.2f}%")
-    print(f"LM-IPLS: {time_lm_ipls:.2f} s, {time_lm_ipls/time_ieks*100:.2f}%")
-    print(f"LS-IPLS: {time_ls_ipls:.2f} s, {time_ls_ipls/time_ieks*100:.2f}%")
+    times = time_interleaved(
+        [
+            ("IEKS", time_ieks),
+            ("LM-IEKS", time_lm_ieks),
+            ("LS-IEKS", time_ls_ieks),
+            ("IPLS", time_ipls),
+            ("LM-IPLS", time_lm_ipls),
+            ("LS-IPLS", time_ls_ipls),
+        ],
+        num_trials,
+    )
+    ref_time = times["IEKS"] / (num_iter * num_trials)
+    for name, time_ in times.items():
+        time_ /= num_iter * num_trials
+        print(f"{name}: {time_:.2f} s, {time_/ref_time*100:.2f}%")
+
+
+def time_interleaved(timed_fns, num_trials):
+    """Time fns in an interleaved loop
+
+    Every fn is first run once as a warm-up, then all fns are run in turn, `num_trials` times,
+    so that warm-up effects (caches, BLAS thread pool, et c.) are shared between them.
+    Garbage collection is disabled while timing, as in `timeit`.
+
+    Args:
+        timed_fns: list of (name, fn) tuples, where fn takes no arguments
+        num_trials: number of timed calls per fn
+
+    Returns:
+        times: dict name -> total time [s] for `num_trials` calls
+    """
+    for _, fn in timed_fns:
+        fn()
+    times = {name: 0.0 for name, _ in timed_fns}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(num_trials):
+            for name, fn in timed_fns:
+                start = perf_counter()
+                fn()
+                times[name] += perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return times
 
 
 def parse_args():
@@ -17,6 +17,7 @@ import logging
 from functools import partial
 from copy import deepcopy
 import numpy as np
+from scipy.linalg import cho_factor
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
 from src.smoother.slr.ipls import SigmaPointIpls
@@ -71,7 +72,7 @@ def main():
     # tunnel_segment = [None, None]
     states, measurements = get_states_and_meas(meas_model, R, range_, tunnel_segment)
     measurements = [meas for meas in measurements]
-    cartes_meas = np.apply_along_axis(partial(to_cartesian_coords, pos=pos), 1, measurements)
+    cartes_meas = to_cartesian_coords(measurements, pos)
 
     prior_mean = np.array([0, 0, 1, 0, 0])
     prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
@@ -92,7 +93,7 @@ def main():
         slr_smoothing_cost_pre_comp,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
+        P_1_0_chol=cho_factor(prior_cov),
     )
     ms_ieks, Ps_ieks, cost_ieks, rmses_ieks, neeses_ieks = run_smoothing(
         Ieks(motion_model, meas_model, args.num_iter), states, measurements, prior_mean, prior_cov, cost_fn_eks
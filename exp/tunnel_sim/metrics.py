@@ -9,8 +9,10 @@ where a car passes through a tunnel, thereby going through the stages of
 """
 import argparse
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
@@ -27,7 +29,7 @@ from src.slr.sigma_points import SigmaPointSlr
 from src.sigma_points import SphericalCubature
 from src.cost_fn.ext import analytical_smoothing_cost
 from src.cost_fn.slr import slr_smoothing_cost_pre_comp, slr_smoothing_cost_means
-from exp.coord_turn.common import plot_results, calc_iter_metrics
+from exp.coord_turn.common import plot_results, calc_iter_metrics_multi
 from src.analytics import rmse, nees
 from data.tunnel_traj import get_states_and_meas
 from src.visualization import plot_scalar_metric_err_bar
@@ -79,124 +81,71 @@ def main():
     c_1, c_2 = 0.1, 0.9
 
     num_mc_samples = args.num_mc_samples
-    rmses_ieks = np.zeros((num_mc_samples, num_iter))
-    rmses_lm_ieks = np.zeros((num_mc_samples, num_iter))
-    rmses_ls_ieks = np.zeros((num_mc_samples, num_iter))
-    rmses_ipls = np.zeros((num_mc_samples, num_iter))
-    rmses_lm_ipls = np.zeros((num_mc_samples, num_iter))
-    rmses_ls_ipls = np.zeros((num_mc_samples, num_iter))
-
-    neeses_gn_ieks = np.zeros((num_mc_samples, num_iter))
-    neeses_lm_ieks = np.zeros((num_mc_samples, num_iter))
-    neeses_ls_ieks = np.zeros((num_mc_samples, num_iter))
-    neeses_gn_ipls = np.zeros((num_mc_samples, num_iter))
-    neeses_lm_ipls = np.zeros((num_mc_samples, num_iter))
-    neeses_ls_ipls = np.zeros((num_mc_samples, num_iter))
-    for mc_iter in range(num_mc_samples):
-        log.info(f"MC iter: {mc_iter+1}/{num_mc_samples}")
-        states, measurements = get_states_and_meas(meas_model, R, range_, tunnel_segment)
-        cost_fn_eks = partial(
-            analytical_smoothing_cost,
-            measurements=measurements,
-            m_1_0=prior_mean,
-            P_1_0=prior_cov,
-            motion_model=motion_model,
-            meas_model=meas_model,
-        )
 
-        sigma_point_method = SphericalCubature()
-        cost_fn_ipls = partial(
-            slr_smoothing_cost_pre_comp,
-            measurements=measurements,
-            m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
-        )
-        ms_gn_ieks, Ps_gn_ieks, cost_gn_ieks, tmp_rmse, tmp_nees = run_smoothing(
-            Ieks(motion_model, meas_model, num_iter), states, measurements, prior_mean, prior_cov, cost_fn_eks
-        )
-        rmses_ieks[mc_iter, :] = tmp_rmse
-        neeses_gn_ieks[mc_iter, :] = tmp_nees
-
-        ms_lm_ieks, Ps_lm_ieks, cost_lm_ieks, tmp_rmse, tmp_nees = run_smoothing(
-            LmIeks(motion_model, meas_model, num_iter, cost_improv_iter_lim=10, lambda_=lambda_, nu=nu),
-            states,
-            measurements,
-            prior_mean,
-            prior_cov,
-            cost_fn_eks,
-        )
-        rmses_lm_ieks[mc_iter, :] = tmp_rmse
-        neeses_lm_ieks[mc_iter, :] = tmp_nees
-
-        dir_der_eks = partial(
-            dir_der_analytical_smoothing_cost,
-            measurements=measurements,
-            m_1_0=prior_mean,
-            P_1_0=prior_cov,
-            motion_model=motion_model,
-            meas_model=meas_model,
-        )
-        ms_ls_ieks, Ps_ls_ieks, cost_ls_ieks, tmp_rmse, tmp_nees = run_smoothing(
-            LsIeks(
-                motion_model,
-                meas_model,
-                num_iter,
-                ArmijoWolfeLineSearch(cost_fn_eks, dir_der_eks, c_1=c_1, c_2=c_2),
-            ),
-            states,
-            measurements,
-            prior_mean,
-            prior_cov,
-            cost_fn_eks,
-        )
-        rmses_ls_ieks[mc_iter, :] = tmp_rmse
-        neeses_ls_ieks[mc_iter, :] = tmp_nees
-
-        ms_gn_ipls, Ps_gn_ipls, cost_gn_ipls, tmp_rmse, tmp_nees = run_smoothing(
-            SigmaPointIpls(motion_model, meas_model, sigma_point_method, num_iter),
-            states,
-            measurements,
-            prior_mean,
-            prior_cov,
-            None,
-        )
-        rmses_ipls[mc_iter, :] = tmp_rmse
-        neeses_gn_ipls[mc_iter, :] = tmp_nees
-
-        ms_lm_ipls, Ps_lm_ipls, cost_lm_ipls, tmp_rmse, tmp_nees = run_smoothing(
-            SigmaPointLmIpls(
-                motion_model, meas_model, sigma_point_method, num_iter, cost_improv_iter_lim=10, lambda_=lambda_, nu=nu
-            ),
-            states,
-            measurements,
-            prior_mean,
-            prior_cov,
-            cost_fn_ipls,
-        )
-        rmses_lm_ipls[mc_iter, :] = tmp_rmse
-        neeses_lm_ipls[mc_iter, :] = tmp_nees
-
-        ls_cost_fn = partial(
-            slr_smoothing_cost_means,
-            measurements=measurements,
-            m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
-            motion_fn=motion_model.map_set,
-            meas_fn=meas_model.map_set,
-            slr_method=SigmaPointSlr(sigma_point_method),
-        )
-        ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls, tmp_rmse, tmp_nees = run_smoothing(
-            SigmaPointLsIpls(
-                motion_model, meas_model, sigma_point_method, num_iter, partial(ArmijoWolfeLineSearch, c_1=c_1, c_2=c_2)
-            ),
-            states,
-            measurements,
-            prior_mean,
-            prior_cov,
-            ls_cost_fn,
-        )
-        rmses_ls_ipls[mc_iter, :] = tmp_rmse
-        neeses_ls_ipls[mc_iter, :] = tmp_nees
+    # Everything but the measurements is constant over the MC samples.
+    P_1_0_chol = cho_factor(prior_cov)
+    sigma_point_method = SphericalCubature()
+    cost_fn_eks_prototype = partial(
+        analytical_smoothing_cost,
+        m_1_0=prior_mean,
+        P_1_0=prior_cov,
+        motion_model=motion_model,
+        meas_model=meas_model,
+    )
+    dir_der_eks_prototype = partial(
+        dir_der_analytical_smoothing_cost,
+        m_1_0=prior_mean,
+        P_1_0=prior_cov,
+        motion_model=motion_model,
+        meas_model=meas_model,
+    )
+    cost_fn_ipls_prototype = partial(
+        slr_smoothing_cost_pre_comp,
+        m_1_0=prior_mean,
+        P_1_0_chol=P_1_0_chol,
+    )
+    ls_cost_fn_prototype = partial(
+        slr_smoothing_cost_means,
+        m_1_0=prior_mean,
+        P_1_0_chol=P_1_0_chol,
+        motion_fn=motion_model.map_set_batch,
+        meas_fn=meas_model.map_set_batch,
+        slr_method=SigmaPointSlr(sigma_point_method),
+    )
+    run_mc_sample_ = partial(
+        run_mc_sample,
+        motion_model=motion_model,
+        meas_model=meas_model,
+        sigma_point_method=sigma_point_method,
+        prior_mean=prior_mean,
+        prior_cov=prior_cov,
+        cost_fn_prototypes=(cost_fn_eks_prototype, dir_der_eks_prototype, cost_fn_ipls_prototype, ls_cost_fn_prototype),
+        num_iter=num_iter,
+        lm_params=(lambda_, nu),
+        armijo_wolfe_params=(c_1, c_2),
+    )
+
+    # The MC samples are generated up front, in the main process, so that the samples only depend on the seed,
+    # not on the number of workers. The smoothers are deterministic given the samples.
+    mc_samples = [get_states_and_meas(meas_model, R, range_, tunnel_segment) for _ in range(num_mc_samples)]
+    log.info(f"Running {num_mc_samples} MC samples with {args.num_workers} worker(s)")
+    if args.num_workers > 1:
+        with ProcessPoolExecutor(max_workers=args.num_workers) as executor:
+            mc_results = list(executor.map(run_mc_sample_, *zip(*mc_samples)))
+    else:
+        mc_results = list(map(run_mc_sample_, *zip(*mc_samples)))
+    # (num_mc_samples, num_smoothers, num_iter)
+    rmses = np.array([rmses_ for rmses_, _ in mc_results])
+    neeses = np.array([neeses_ for _, neeses_ in mc_results])
+    rmses_ieks, rmses_lm_ieks, rmses_ls_ieks, rmses_ipls, rmses_lm_ipls, rmses_ls_ipls = np.moveaxis(rmses, 1, 0)
+    (
+        neeses_gn_ieks,
+        neeses_lm_ieks,
+        neeses_ls_ieks,
+        neeses_gn_ipls,
+        neeses_lm_ipls,
+        neeses_ls_ipls,
+    ) = np.moveaxis(neeses, 1, 0)
 
     label_ieks, label_lm_ieks, label_ls_ieks, label_ipls, label_lm_ipls, label_ls_ipls = (
         "IEKS",
@@ -230,6 +179,107 @@ def main():
     plot_scalar_metric_err_bar(nees_stats, "NEES")
 
 
+def run_mc_sample(
+    states,
+    measurements,
+    motion_model,
+    meas_model,
+    sigma_point_method,
+    prior_mean,
+    prior_cov,
+    cost_fn_prototypes,
+    num_iter,
+    lm_params,
+    armijo_wolfe_params,
+):
+    """Run all smoothers on a single MC sample
+
+    Module level fn. so that it can be dispatched to worker processes.
+
+    Returns:
+        rmses (num_smoothers, num_iter)
+        neeses (num_smoothers, num_iter)
+    """
+    cost_fn_eks_prototype, dir_der_eks_prototype, cost_fn_ipls_prototype, ls_cost_fn_prototype = cost_fn_prototypes
+    lambda_, nu = lm_params
+    c_1, c_2 = armijo_wolfe_params
+    cost_fn_eks = partial(cost_fn_eks_prototype, measurements=measurements)
+    cost_fn_ipls = partial(cost_fn_ipls_prototype, measurements=measurements)
+    rmses, neeses = [], []
+    ms_gn_ieks, Ps_gn_ieks, cost_gn_ieks, tmp_rmse, tmp_nees = run_smoothing(
+        Ieks(motion_model, meas_model, num_iter), states, measurements, prior_mean, prior_cov, cost_fn_eks
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+
+    ms_lm_ieks, Ps_lm_ieks, cost_lm_ieks, tmp_rmse, tmp_nees = run_smoothing(
+        LmIeks(motion_model, meas_model, num_iter, cost_improv_iter_lim=10, lambda_=lambda_, nu=nu),
+        states,
+        measurements,
+        prior_mean,
+        prior_cov,
+        cost_fn_eks,
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+
+    dir_der_eks = partial(dir_der_eks_prototype, measurements=measurements)
+    ms_ls_ieks, Ps_ls_ieks, cost_ls_ieks, tmp_rmse, tmp_nees = run_smoothing(
+        LsIeks(
+            motion_model,
+            meas_model,
+            num_iter,
+            ArmijoWolfeLineSearch(cost_fn_eks, dir_der_eks, c_1=c_1, c_2=c_2),
+        ),
+        states,
+        measurements,
+        prior_mean,
+        prior_cov,
+        cost_fn_eks,
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+
+    ms_gn_ipls, Ps_gn_ipls, cost_gn_ipls, tmp_rmse, tmp_nees = run_smoothing(
+        SigmaPointIpls(motion_model, meas_model, sigma_point_method, num_iter),
+        states,
+        measurements,
+        prior_mean,
+        prior_cov,
+        None,
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+
+    ms_lm_ipls, Ps_lm_ipls, cost_lm_ipls, tmp_rmse, tmp_nees = run_smoothing(
+        SigmaPointLmIpls(
+            motion_model, meas_model, sigma_point_method, num_iter, cost_improv_iter_lim=10, lambda_=lambda_, nu=nu
+        ),
+        states,
+        measurements,
+        prior_mean,
+        prior_cov,
+        cost_fn_ipls,
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+
+    ls_cost_fn = partial(ls_cost_fn_prototype, measurements=measurements)
+    ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls, tmp_rmse, tmp_nees = run_smoothing(
+        SigmaPointLsIpls(
+            motion_model, meas_model, sigma_point_method, num_iter, partial(ArmijoWolfeLineSearch, c_1=c_1, c_2=c_2)
+        ),
+        states,
+        measurements,
+        prior_mean,
+        prior_cov,
+        ls_cost_fn,
+    )
+    rmses.append(tmp_rmse)
+    neeses.append(tmp_nees)
+    return np.array(rmses), np.array(neeses)
+
+
 def run_smoothing(smoother, states, measurements, prior_mean, prior_cov, cost_fn, init_traj=None):
     """Common function that runs a smoother and collects metrics
 
@@ -242,16 +292,14 @@ def run_smoothing(smoother, states, measurements, prior_mean, prior_cov, cost_fn
         )
         stored_est = smoother.stored_estimates()
         next(stored_est)
-        stored_est = list(stored_est)
     else:
         _, _, ms, Ps, iter_cost = smoother.filter_and_smooth(measurements, prior_mean, prior_cov, cost_fn)
-        stored_est = list(smoother.stored_estimates())
-    rmses = calc_iter_metrics(
-        lambda means, covs, states: rmse(means[:, :2], states), stored_est, states, smoother.num_iter
-    )
-    # assert np.allclose(ms_st, ms)
-    neeses = calc_iter_metrics(
-        lambda means, covs, states: np.mean(nees(states, means[:, :2], covs[:, :2, :2])),
+        stored_est = smoother.stored_estimates()
+    rmses, neeses = calc_iter_metrics_multi(
+        (
+            lambda means, covs, states: rmse(means[:, :2], states),
+            lambda means, covs, states: np.mean(nees(states, means[:, :2], covs[:, :2, :2])),
+        ),
         stored_est,
         states,
         smoother.num_iter,
@@ -281,6 +329,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="LM-IEKS paper experiment.")
     parser.add_argument("--num_iter", type=int, default=10)
     parser.add_argument("--num_mc_samples", type=int, default=100)
+    parser.add_argument("--num_workers", type=int, default=1, help="Number of processes running the MC samples")
 
     return parser.parse_args()
 
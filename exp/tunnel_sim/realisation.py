@@ -11,6 +11,7 @@ import argparse
 import logging
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 import matplotlib.pyplot as plt
 from src.smoother.ext.ieks import Ieks
 from src.smoother.ext.lm_ieks import LmIeks
@@ -71,7 +72,7 @@ def main():
     # tunnel_segment = [None, None]
     states, measurements = get_states_and_meas(meas_model, R, range_, tunnel_segment)
     measurements = [meas for meas in measurements]
-    cartes_meas = np.apply_along_axis(partial(to_cartesian_coords, pos=pos), 1, measurements)
+    cartes_meas = to_cartesian_coords(measurements, pos)
 
     prior_mean = np.array([0, 0, 1, 0, 0])
     prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
@@ -98,7 +99,7 @@ def main():
         slr_smoothing_cost_pre_comp,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
+        P_1_0_chol=cho_factor(prior_cov),
     )
     ms_ieks, Ps_ieks, cost_ieks, rmses_ieks, neeses_ieks = run_smoothing(
         Ieks(motion_model, meas_model, args.num_iter), states, measurements, prior_mean, prior_cov, cost_fn_eks
@@ -163,9 +164,9 @@ def main():
         slr_smoothing_cost_means,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0_inv=np.linalg.inv(prior_cov),
-        motion_fn=motion_model.map_set,
-        meas_fn=meas_model.map_set,
+        P_1_0_chol=cho_factor(prior_cov),
+        motion_fn=motion_model.map_set_batch,
+        meas_fn=meas_model.map_set_batch,
         slr_method=SigmaPointSlr(sigma_point_method),
     )
 
@@ -185,6 +186,8 @@ def main():
     )
     results.append((ms_ls_ipls, Ps_ls_ipls, cost_ls_ipls[1:], "LS-IPLS"))
 
+    if args.no_plot:
+        return
     plot_results(
         states,
         results,
@@ -260,6 +263,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Tunnel sim. experiment")
     parser.add_argument("--random", action="store_true")
     parser.add_argument("--num_iter", type=int, default=10)
+    parser.add_argument("--no_plot", action="store_true", help="Only run the smoothers, e.g. when profiling")
 
     return parser.parse_args()
 
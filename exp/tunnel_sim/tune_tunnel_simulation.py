@@ -56,7 +56,7 @@ def main():
     tunnel_segment = [145, 165]
     # tunnel_segment = [None, None]
     states, measurements = get_states_and_meas(meas_model, R, range_, tunnel_segment)
-    cartes_meas = np.apply_along_axis(partial(to_cartesian_coords, pos=pos), 1, measurements)
+    cartes_meas = to_cartesian_coords(measurements, pos)
 
     prior_mean = np.array([0, 0, 1, 0, 0])
     prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
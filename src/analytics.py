@@ -23,21 +23,20 @@ def nees(true, est, cov):
 
     eps_k = e_k^T P_k^-1 e_k
 
+    Vectorised over all time steps and broadcasts over leading dimensions of `est` and `cov`,
+    e.g. estimates from several iterations (N, K, D_x), (N, K, D_x, D_x).
+
     Args:
         true (K, D_x)
-        est (K, D_x)
-        cov (K, D_x, D_x)
+        est (..., K, D_x)
+        cov (..., K, D_x, D_x)
 
     Returns:
-        nees (K, 1)
+        nees (..., K, 1)
     """
-    K, D_x = true.shape
     err = true - est
-    nees_ = np.empty((K, 1))
-    for k, (err_k, cov_k) in enumerate(zip(err, cov)):
-        err_k = err_k.reshape((D_x, 1))
-        nees_[k] = _single_nees(err_k, cov_k)
-    return nees_
+    weighted_err = np.linalg.solve(cov, err[..., np.newaxis])[..., 0]
+    return np.einsum("...i,...i->...", err, weighted_err)[..., np.newaxis]
 
 
 def mc_stats(data):
@@ -45,11 +44,6 @@ def mc_stats(data):
     return np.mean(data, 0), np.std(data, 0) / np.sqrt(num_mc_samples)
 
 
-def _single_nees(err, cov):
-    """Calculate NEES for single entry"""
-    return err.T @ np.linalg.inv(cov) @ err
-
-
 def is_pos_def(x):
     """Is positive definite
     Returns True if all eigen values are positive,
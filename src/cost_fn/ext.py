@@ -1,13 +1,38 @@
 """Analytical cost functions for the extended Kalman filter/RTS smoother"""
 import logging
+from typing import Optional
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve
 from src.models.base import MotionModel, MeasModel
 from src.slr.base import Slr
 
 LOGGER = logging.getLogger(__name__)
 
 
-def analytical_smoothing_cost(traj, measurements, m_1_0, P_1_0, motion_model: MotionModel, meas_model: MeasModel):
+class NoiseFactorCache:
+    """Cholesky factorisations of the prior, process and measurement noise covariances
+
+    The factorisations only depend on the models and the prior, so they can be computed once for a smoother run
+    and shared between all cost function (and derivative) evaluations,
+    e.g. `partial(analytical_smoothing_cost, ..., noise_factors=NoiseFactorCache(motion_model, meas_model, P_1_0))`.
+    Assumes that the noise covariances are the same for all time steps.
+    """
+
+    def __init__(self, motion_model: MotionModel, meas_model: MeasModel, P_1_0):
+        self.Q_chol = cho_factor(motion_model.proc_noise(1))
+        self.R_chol = cho_factor(meas_model.meas_noise(1))
+        self.P_1_0_chol = cho_factor(P_1_0)
+
+
+def analytical_smoothing_cost(
+    traj,
+    measurements,
+    m_1_0,
+    P_1_0,
+    motion_model: MotionModel,
+    meas_model: MeasModel,
+    noise_factors: Optional[NoiseFactorCache] = None,
+):
     """Cost function for an optimisation problem used in the family of extended smoothers
     Efficient implementation which assumes that the motion and meas models have no explicit dependency on the time step.
 
@@ -20,30 +45,36 @@ def analytical_smoothing_cost(traj, measurements, m_1_0, P_1_0, motion_model: Mo
             (The actual variable in the cost function)
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
+        noise_factors: pre-computed `NoiseFactorCache`, the noise covariances are factorised in the call if None.
     """
-    K = len(measurements)
-    prior_diff = traj[0, :] - m_1_0
-    _cost = prior_diff.T @ np.linalg.inv(P_1_0) @ prior_diff
+    if noise_factors is None:
+        noise_factors = NoiseFactorCache(motion_model, meas_model, P_1_0)
+    Q_chol, R_chol, P_1_0_chol = noise_factors.Q_chol, noise_factors.R_chol, noise_factors.P_1_0_chol
 
-    motion_diff = traj[1:, :] - motion_model.map_set(traj[:-1, :], None)
-    meas_diff = measurements - meas_model.map_set(traj, None)
-    for k in range(0, K - 1):
-        _cost += motion_diff[k, :].T @ np.linalg.inv(motion_model.proc_noise(k)) @ motion_diff[k, :]
-        # measurements are zero indexed, i.e. k-1 --> y_k
-        if any(np.isnan(meas_diff[k, :])):
-            continue
-        _cost += meas_diff[k, :].T @ np.linalg.inv(meas_model.meas_noise(k)) @ meas_diff[k, :]
-    _cost += meas_diff[-1, :].T @ np.linalg.inv(meas_model.meas_noise(K)) @ meas_diff[-1, :]
+    prior_diff, motion_diff, meas_diff = smoothing_residuals(traj, measurements, m_1_0, motion_model, meas_model)
+    _cost = prior_diff.T @ cho_solve(P_1_0_chol, prior_diff)
+    _cost += _sum_quad_forms(motion_diff, Q_chol)
+    # Missing measurements (NaN) do not contribute to the cost
+    _cost += _sum_quad_forms(meas_diff[~np.isnan(meas_diff).any(axis=1)], R_chol)
 
     return _cost
 
 
 def dir_der_analytical_smoothing_cost(
-    x_0, p, measurements, m_1_0, P_1_0, motion_model: MotionModel, meas_model: MeasModel
+    x_0,
+    p,
+    measurements,
+    m_1_0,
+    P_1_0,
+    motion_model: MotionModel,
+    meas_model: MeasModel,
+    noise_factors: Optional[NoiseFactorCache] = None,
 ):
     """Directional derivative of the cost function f in `analytical_smoothing_cost`
 
     Here, the full trajectory x_1:K is interpreted as one vector (x_1^T, ..., x_K)^T with K d_x elements.
+    If both models are time invariant, the computation is delegated to `dir_der_analytical_smoothing_cost_const_models`,
+    which solves with the Cholesky factors of the noise covariances instead of one solve per time step.
 
     Args:
         x_0: current iterate
@@ -52,36 +83,47 @@ def dir_der_analytical_smoothing_cost(
             represented as a np.array(K, D_x).
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
+        noise_factors: pre-computed `NoiseFactorCache`, only used for time invariant models.
     """
+    if motion_model.time_invariant and meas_model.time_invariant:
+        return dir_der_analytical_smoothing_cost_const_models(
+            x_0, p, measurements, m_1_0, P_1_0, motion_model, meas_model, noise_factors
+        )
     K = len(measurements)
+    # The meas. dim. may vary with the time step, so the measurements are not stacked.
+    obs = np.array([not np.isnan(meas_k).any() for meas_k in measurements])
 
     prior_diff = x_0[0, :] - m_1_0
     motion_diff = x_0[1:, :] - motion_model.map_set(x_0[:-1, :], None)
 
-    der = p[0, :] @ np.linalg.inv(P_1_0) @ prior_diff
+    der = p[0, :] @ np.linalg.solve(P_1_0, prior_diff)
     H_1 = meas_model.jacobian(x_0[0, :], 1)
-    R_1_inv = np.linalg.inv(meas_model.meas_noise(1))
-    meas_model.mapping(x_0[0, :], 1)
     meas_diff_1 = measurements[0] - meas_model.mapping(x_0[0, :], 1)
-    der -= p[0, :] @ H_1.T @ R_1_inv @ meas_diff_1
+    der -= p[0, :] @ H_1.T @ np.linalg.solve(meas_model.meas_noise(1), meas_diff_1)
 
     for k_ind in range(1, K):
         k = k_ind + 1
         F_k_min_1 = motion_model.jacobian(x_0[k_ind - 1, :], k - 1)
         factor_1 = p[k_ind, :].T - F_k_min_1 @ p[k_ind - 1, :].T
-        der += factor_1 @ np.linalg.inv(motion_model.proc_noise(k - 1)) @ motion_diff[k_ind - 1, :]
-        if any(np.isnan(measurements[k_ind])):
+        der += factor_1 @ np.linalg.solve(motion_model.proc_noise(k - 1), motion_diff[k_ind - 1, :])
+        if not obs[k_ind]:
             continue
         meas_diff_k = measurements[k_ind] - meas_model.mapping(x_0[k_ind, :], k)
         H_k = meas_model.jacobian(x_0[k_ind, :], k)
-        R_k_inv = np.linalg.inv(meas_model.meas_noise(k))
-        der -= p[k_ind, :] @ H_k.T @ R_k_inv @ meas_diff_k
+        der -= p[k_ind, :] @ H_k.T @ np.linalg.solve(meas_model.meas_noise(k), meas_diff_k)
 
     return der
 
 
 def dir_der_analytical_smoothing_cost_const_models(
-    x_0, p, measurements, m_1_0, P_1_0, motion_model: MotionModel, meas_model: MeasModel
+    x_0,
+    p,
+    measurements,
+    m_1_0,
+    P_1_0,
+    motion_model: MotionModel,
+    meas_model: MeasModel,
+    noise_factors: Optional[NoiseFactorCache] = None,
 ):
     """Directional derivative of the cost function f in `analytical_smoothing_cost`
 
@@ -96,33 +138,38 @@ def dir_der_analytical_smoothing_cost_const_models(
             represented as a np.array(K, D_x).
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
+        noise_factors: pre-computed `NoiseFactorCache`, the noise covariances are factorised in the call if None.
     """
     K = len(measurements)
 
-    prior_diff = x_0[0, :] - m_1_0
-    motion_diff = x_0[1:, :] - motion_model.map_set(x_0[:-1, :], None)
-    meas_diff = measurements - meas_model.map_set(x_0, None)
+    prior_diff, motion_diff, meas_diff = smoothing_residuals(x_0, measurements, m_1_0, motion_model, meas_model)
+    if noise_factors is None:
+        noise_factors = NoiseFactorCache(motion_model, meas_model, P_1_0)
+    Q_chol, R_chol, P_1_0_chol = noise_factors.Q_chol, noise_factors.R_chol, noise_factors.P_1_0_chol
 
-    der = p[0, :] @ np.linalg.inv(P_1_0) @ prior_diff
-    H_1 = meas_model.jacobian(x_0[0, :], 1)
-    R_1_inv = np.linalg.inv(meas_model.meas_noise(1))
-    der -= p[0, :] @ H_1.T @ R_1_inv @ meas_diff[0, :]
+    der = p[0, :] @ cho_solve(P_1_0_chol, prior_diff)
 
-    for k_ind in range(1, K):
-        k = k_ind + 1
-        F_k_min_1 = motion_model.jacobian(x_0[k_ind - 1, :], k - 1)
-        factor_1 = p[k_ind, :].T - F_k_min_1 @ p[k_ind - 1, :].T
-        der += factor_1 @ np.linalg.inv(motion_model.proc_noise(k - 1)) @ motion_diff[k_ind - 1, :]
-        if any(np.isnan(meas_diff[k_ind, :])):
-            continue
-        H_k = meas_model.jacobian(x_0[k_ind, :], k)
-        R_k_inv = np.linalg.inv(meas_model.meas_noise(k))
-        der -= p[k_ind, :] @ H_k.T @ R_k_inv @ meas_diff[k_ind, :]
+    F = motion_model.jacobian_set(x_0[:-1, :])
+    factor_1 = p[1:, :] - np.einsum("kij,kj->ki", F, p[:-1, :])
+    der += np.einsum("ki,ik->", factor_1, cho_solve(Q_chol, motion_diff.T))
+
+    # Missing measurements (NaN) do not contribute
+    obs = ~np.isnan(meas_diff).any(axis=1)
+    H = meas_model.jacobian_set(x_0[obs, :])
+    der -= np.einsum("ki,kji,jk->", p[obs, :], H, cho_solve(R_chol, meas_diff[obs, :].T))
 
     return der
 
 
-def grad_analytical_smoothing_cost(x_0, measurements, m_1_0, P_1_0, motion_model: MotionModel, meas_model: MeasModel):
+def grad_analytical_smoothing_cost(
+    x_0,
+    measurements,
+    m_1_0,
+    P_1_0,
+    motion_model: MotionModel,
+    meas_model: MeasModel,
+    noise_factors: Optional[NoiseFactorCache] = None,
+):
     """Gradient of the cost function f in `analytical_smoothing_cost`
     Here, the full trajectory x_1:K is interpreted as one vector (x_1^T, ..., x_K)^T with K d_x elements.
 
@@ -131,42 +178,29 @@ def grad_analytical_smoothing_cost(x_0, measurements, m_1_0, P_1_0, motion_model
             represented as a np.array(K, D_x).
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
+        noise_factors: pre-computed `NoiseFactorCache`, the noise covariances are factorised in the call if None.
     """
     K = len(measurements)
     D_x = m_1_0.shape[0]
     grad_pred = np.zeros((K * D_x,))
-    grad_update = np.zeros(grad_pred.shape)
 
-    prior_diff = x_0[0, :] - m_1_0
-    motion_diff = x_0[1:, :] - motion_model.map_set(x_0[:-1, :], None)
+    prior_diff, motion_diff, meas_diff = smoothing_residuals(x_0, measurements, m_1_0, motion_model, meas_model)
+    if noise_factors is None:
+        noise_factors = NoiseFactorCache(motion_model, meas_model, P_1_0)
+    Q_chol, R_chol, P_1_0_chol = noise_factors.Q_chol, noise_factors.R_chol, noise_factors.P_1_0_chol
 
-    grad_pred[0:D_x] = np.linalg.inv(P_1_0) @ prior_diff
-    F_1 = motion_model.jacobian(x_0[0, :], 1)
-    grad_update[0:D_x] = F_1.T @ np.linalg.inv(motion_model.proc_noise(1)) @ motion_diff[0, :]
+    grad_pred[0:D_x] = cho_solve(P_1_0_chol, prior_diff)
+    # Q^-1 (x_k+1 - f(x_k)), k = 1, ..., K-1, as a (K-1, D_x) array.
+    weighted_motion_diff = cho_solve(Q_chol, motion_diff.T).T
+    grad_pred[D_x : (K - 1) * D_x] = weighted_motion_diff[:-1, :].ravel()
 
-    for k_ind in range(1, K - 1):
-        k = k_ind + 1
-        grad_pred[k_ind * D_x : (k_ind + 1) * D_x] = (
-            np.linalg.inv(motion_model.proc_noise(k - 1)) @ motion_diff[k_ind - 1, :]
-        )
-        F_k = motion_model.jacobian(x_0[k_ind, :], k)
-        grad_update[k_ind * D_x : (k_ind + 1) * D_x] = (
-            F_k.T @ np.linalg.inv(motion_model.proc_noise(k)) @ motion_diff[k_ind, :]
-        )
-
-    grad_update[0:D_x] = np.linalg.inv(motion_model.proc_noise(K - 1)) @ motion_diff[-1, :]
-
-    meas_diff = measurements - meas_model.map_set(x_0, None)
-    grad_meas = np.zeros(grad_pred.shape)
-    for k_ind in range(0, K):
-        k = k_ind + 1
-        if any(np.isnan(meas_diff[k_ind, :])):
-            continue
-        H_k = meas_model.jacobian(x_0[k_ind, :], k)
-        R_k_inv = np.linalg.inv(meas_model.meas_noise(k))
-        grad_meas[k_ind * D_x : (k_ind + 1) * D_x] = H_k.T @ R_k_inv @ meas_diff[k_ind, :]
+    # Missing measurements (NaN) do not contribute
+    obs = ~np.isnan(meas_diff).any(axis=1)
+    H = meas_model.jacobian_set(x_0[obs, :])
+    grad_meas = np.zeros((K, D_x))
+    grad_meas[obs, :] = np.einsum("kji,jk->ki", H, cho_solve(R_chol, meas_diff[obs, :].T))
 
-    return grad_pred - grad_meas  # - grad_update
+    return grad_pred - grad_meas.reshape(grad_pred.shape)
 
 
 def analytical_smoothing_cost_time_dep(
@@ -186,25 +220,41 @@ def analytical_smoothing_cost_time_dep(
             represented as a list of length K of np.array(D_y,)
     """
     prior_diff = traj[0, :] - m_1_0
-    _cost = prior_diff.T @ np.linalg.inv(P_1_0) @ prior_diff
+    _cost = prior_diff.T @ np.linalg.solve(P_1_0, prior_diff)
 
     K, D_x = traj.shape
-    for k in range(1, K + 1):
-        k_ind = k - 1
-        if k < K:
-            motion_diff_k = traj[k_ind + 1, :] - motion_model.mapping(traj[k_ind, :], k)
-            _cost += motion_diff_k.T @ np.linalg.inv(motion_model.proc_noise(k)) @ motion_diff_k
-        meas_k = measurements[k_ind]
-        if any(np.isnan(meas_k)):
-            continue
-        meas_diff_k = meas_k - meas_model.mapping(traj[k_ind, :], k)
-        _cost += meas_diff_k.T @ np.linalg.inv(meas_model.meas_noise(k)) @ meas_diff_k
+    # x_k is mapped with time step k, for k = 1, ..., K
+    motion_diff = traj[1:, :] - motion_model.map_traj(traj[:-1, :])
+    proc_noise = np.array([motion_model.proc_noise(k) for k in range(1, K)])
+    _cost += _sum_quad_forms_time_dep(motion_diff, proc_noise)
+
+    # Missing measurements (NaN) do not contribute to the cost
+    obs_tss = np.array([k for k, meas_k in enumerate(measurements, 1) if not np.isnan(meas_k).any()], dtype=int)
+    if not meas_model.time_invariant:
+        # The meas. dim. may vary with the time step (e.g. `BearingsVaryingSensors`), so the meas. are not stacked.
+        for k in obs_tss:
+            meas_diff_k = measurements[k - 1] - meas_model.mapping(traj[k - 1, :], k)
+            _cost += meas_diff_k @ np.linalg.solve(meas_model.meas_noise(k), meas_diff_k)
+        return _cost
+
+    measurements = np.asarray(measurements)
+    meas_diff = measurements[obs_tss - 1] - meas_model.map_traj(traj)[obs_tss - 1]
+    meas_noise = np.array([meas_model.meas_noise(k) for k in obs_tss])
+    _cost += _sum_quad_forms_time_dep(meas_diff, meas_noise)
 
     return _cost
 
 
 def analytical_smoothing_cost_lm_ext(
-    traj, measurements, prev_means, m_1_0, P_1_0, motion_model: MotionModel, meas_model: MeasModel, lambda_
+    traj,
+    measurements,
+    prev_means,
+    m_1_0,
+    P_1_0,
+    motion_model: MotionModel,
+    meas_model: MeasModel,
+    lambda_,
+    noise_factors: Optional[NoiseFactorCache] = None,
 ):
     """Cost function for an optimisation problem used in the family of extended smoothers
     with LM regularisation
@@ -218,19 +268,17 @@ def analytical_smoothing_cost_lm_ext(
             (The actual variable in the cost function)
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
+        noise_factors: pre-computed `NoiseFactorCache`, the noise covariances are factorised in the call if None.
     """
-    prior_diff = traj[0, :] - m_1_0
-    _cost = prior_diff.T @ np.linalg.inv(P_1_0) @ prior_diff
+    if noise_factors is None:
+        noise_factors = NoiseFactorCache(motion_model, meas_model, P_1_0)
+    Q_chol, R_chol, P_1_0_chol = noise_factors.Q_chol, noise_factors.R_chol, noise_factors.P_1_0_chol
 
-    motion_diff = traj[1:, :] - motion_model.map_set(traj[:-1, :], None)
-    meas_diff = measurements - meas_model.map_set(traj, None)
-    for k in range(0, traj.shape[0] - 1):
-        _cost += motion_diff[k, :].T @ np.linalg.inv(motion_model.proc_noise(k)) @ motion_diff[k, :]
-        # measurements are zero indexed, i.e. k-1 --> y_k
-        if any(np.isnan(meas_diff[k, :])):
-            continue
-        _cost += meas_diff[k, :].T @ np.linalg.inv(meas_model.meas_noise(k)) @ meas_diff[k, :]
-    _cost += meas_diff[-1, :].T @ np.linalg.inv(meas_model.meas_noise(measurements.shape[0])) @ meas_diff[-1, :]
+    prior_diff, motion_diff, meas_diff = smoothing_residuals(traj, measurements, m_1_0, motion_model, meas_model)
+    _cost = prior_diff.T @ cho_solve(P_1_0_chol, prior_diff)
+    _cost += _sum_quad_forms(motion_diff, Q_chol)
+    # Missing measurements (NaN) do not contribute to the cost
+    _cost += _sum_quad_forms(meas_diff[~np.isnan(meas_diff).any(axis=1)], R_chol)
 
     lm_dist = _lm_ext(traj, prev_means, lambda_)
     _cost += lm_dist
@@ -238,8 +286,57 @@ def analytical_smoothing_cost_lm_ext(
     return _cost
 
 
+def smoothing_residuals(traj, measurements, m_1_0, motion_model: MotionModel, meas_model: MeasModel):
+    """Residuals of the smoothing cost function
+
+    Computes the nonlinear model evaluations once, such that they can be shared between
+    the cost function and its derivatives.
+    Assumes that the motion and meas models have no explicit dependency on the time step.
+
+    Args:
+        traj: states for a time sequence 1, ..., K
+            represented as a np.array(K, D_x).
+        measurements: measurements for a time sequence 1, ..., K
+            represented as a np.array(K, D_y), missing measurements are NaN.
+
+    Returns:
+        prior_diff: x_1 - m_1_0 (D_x,)
+        motion_diff: x_k - f(x_k-1), k = 2, ..., K (K-1, D_x)
+        meas_diff: y_k - h(x_k), k = 1, ..., K (K, D_y)
+    """
+    prior_diff = traj[0, :] - m_1_0
+    motion_diff = traj[1:, :] - motion_model.map_set(traj[:-1, :], None)
+    meas_diff = measurements - meas_model.map_set(traj, None)
+    return prior_diff, motion_diff, meas_diff
+
+
+def _sum_quad_forms(diffs, cov_chol):
+    """Sum of the quadratic forms diff_k^T cov^-1 diff_k over the rows of diffs
+
+    Args:
+        diffs (K, D)
+        cov_chol: Cholesky factorisation of the common covariance (D, D), as returned by `scipy.linalg.cho_factor`
+    """
+    return np.einsum("ki,ik->", diffs, cho_solve(cov_chol, diffs.T))
+
+
+def _sum_quad_forms_time_dep(diffs, covs):
+    """Sum of the quadratic forms diff_k^T cov_k^-1 diff_k
+
+    Time dependent version of `_sum_quad_forms`, with one covariance per row of diffs.
+
+    Args:
+        diffs (K, D)
+        covs (K, D, D)
+    """
+    if diffs.shape[0] == 0:
+        return 0.0
+    return np.einsum("ki,ki->", diffs, np.linalg.solve(covs, diffs[:, :, np.newaxis])[:, :, 0])
+
+
 def _lm_ext(x, prev_x, lambda_):
-    return lambda_ * ((x - prev_x) ** 2).sum()
+    diff = (x - prev_x).ravel()
+    return lambda_ * diff @ diff
 
 
 def _ss_cost(means, measurements, m_1_0, P_1_0, Q, R, f_fun, h_fun):
@@ -2,6 +2,7 @@
 import logging
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve
 from src.models.base import MotionModel, MeasModel
 from src.slr.base import Slr
 
@@ -9,7 +10,7 @@ LOGGER = logging.getLogger(__name__)
 
 
 def slr_smoothing_cost_pre_comp(
-    traj, measurements, m_1_0, P_1_0_inv, motion_bar, meas_bar, motion_cov_inv, meas_cov_inv
+    traj, measurements, m_1_0, P_1_0_chol, motion_bar, meas_bar, motion_cov_inv, meas_cov_inv
 ):
     """Cost function for an optimisation problem used in the family of slr smoothers
 
@@ -23,31 +24,38 @@ def slr_smoothing_cost_pre_comp(
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
         m_1_0 (D_x,): Prior mean for time 1
-        P_1_0_inv (D_x, D_x): Inverse prior covariance for time 1
+        P_1_0_chol: Cholesky factorisation of the prior covariance for time 1, as returned by `scipy.linalg.cho_factor`
         motion_bar: estimated SLR expectation for the motion model for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_x,)
+            represented as a np.array(K, D_x)
         meas_bar: estimated SLR expectation for the meas model for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_y,)
+            represented as a np.array(K, D_y)
         motion_cov_inv: estimated inverse covariances (Omega_k + Q_k) for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_x, D_x)
+            represented as a np.array(K, D_x, D_x)
         meas_cov_inv: estimated inverse covariances (Lambda_k + R_k) for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_x, D_x)
+            represented as a np.array(K, D_y, D_y)
+
+    For time variant meas. models, D_y may vary with the time step and the meas. quantities are then
+    lists of length K (cf. `SlrCache`), which are not stacked.
     """
-    K = len(measurements)
+    motion_bar, motion_cov_inv = np.asarray(motion_bar), np.asarray(motion_cov_inv)
 
     prior_diff = traj[0, :] - m_1_0
-    _cost = prior_diff.T @ P_1_0_inv @ prior_diff
-
-    for k in range(1, K + 1):
-        k_ind = k - 1
-        if k < K:
-            motion_diff_k = traj[k_ind + 1, :] - motion_bar[k_ind]
-            _cost += motion_diff_k.T @ motion_cov_inv[k_ind] @ motion_diff_k
-        meas_k = measurements[k_ind]
-        if any(np.isnan(meas_k)):
-            continue
-        meas_diff_k = meas_k - meas_bar[k_ind]
-        _cost += meas_diff_k.T @ meas_cov_inv[k_ind] @ meas_diff_k
+    _cost = prior_diff.T @ cho_solve(P_1_0_chol, prior_diff)
+
+    motion_diff = traj[1:, :] - motion_bar[:-1]
+    _cost += np.einsum("ki,kij,kj->", motion_diff, motion_cov_inv[:-1], motion_diff)
+
+    # Missing measurements (NaN) do not contribute to the cost
+    obs = _observed(measurements)
+    if isinstance(meas_bar, list):
+        for k_ind in np.flatnonzero(obs):
+            meas_diff_k = measurements[k_ind] - meas_bar[k_ind]
+            _cost += meas_diff_k @ meas_cov_inv[k_ind] @ meas_diff_k
+        return _cost
+
+    measurements, meas_cov_inv = np.asarray(measurements), np.asarray(meas_cov_inv)
+    meas_diff = measurements[obs] - meas_bar[obs]
+    _cost += np.einsum("ki,kij,kj->", meas_diff, meas_cov_inv[obs], meas_diff)
 
     return _cost
 
@@ -67,46 +75,40 @@ def dir_der_slr_smoothing_cost(
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
     """
-    motion_slr = [
-        slr_method.slr(partial(motion_fn, time_step=k), mean_k, cov_k)
-        for (k, (mean_k, cov_k)) in enumerate(zip(x_0, estimated_covs), 1)
-    ]
-
-    meas_slr = [
-        slr_method.slr(partial(meas_fn, time_step=k), mean_k, cov_k)
-        for (k, (mean_k, cov_k)) in enumerate(zip(x_0, estimated_covs), 1)
-    ]
-    K = len(measurements)
+    estimated_covs, motion_cov_inv = np.asarray(estimated_covs), np.asarray(motion_cov_inv)
+    # The SLR quantities for all time steps are computed in a single batched pass.
+    motion_bar, motion_psi, _ = slr_method.slr_batch(motion_fn, x_0, estimated_covs)
+    meas_bar, meas_psi, _ = slr_method.slr_batch(meas_fn, x_0, estimated_covs)
+    obs = _observed(measurements)
 
     prior_diff = x_0[0, :] - m_1_0
-    der = p[0, :] @ np.linalg.inv(P_1_0) @ prior_diff
-    meas_z_bar_1, meas_psi_1, _ = meas_slr[0]
-
-    H_1 = meas_psi_1.T @ np.linalg.inv(estimated_covs[0])
-    R_1_inv = meas_cov_inv[0]
-    meas_diff_1 = measurements[0] - meas_z_bar_1
-    der -= p[0, :] @ H_1.T @ R_1_inv @ meas_diff_1
-
-    for k_ind in range(1, K):
-        motion_z_bar_k, motion_psi_k, _ = motion_slr[k_ind - 1]
-        F_k_min_1 = motion_psi_k.T @ np.linalg.inv(estimated_covs[k_ind - 1])
-        factor_1 = p[k_ind, :].T - F_k_min_1 @ p[k_ind - 1, :].T
-        motion_diff_k_min_1 = x_0[k_ind] - motion_z_bar_k
-        der += factor_1 @ motion_cov_inv[k_ind - 1] @ motion_diff_k_min_1
-
-        meas_k = measurements[k_ind]
-        if any(np.isnan(meas_k)):
-            continue
-        meas_z_bar_k, meas_psi_k, _ = meas_slr[k_ind]
-        H_k = meas_psi_k.T @ np.linalg.inv(estimated_covs[k_ind])
-        meas_diff_k = meas_k - meas_z_bar_k
-        der -= p[k_ind, :] @ H_k.T @ meas_cov_inv[k_ind] @ meas_diff_k
+    der = p[0, :] @ np.linalg.solve(P_1_0, prior_diff)
+
+    # F_k^T = P_k^-1 psi_k, for k = 1, ..., K-1
+    F_T = np.linalg.solve(estimated_covs[:-1], motion_psi[:-1])
+    factor_1 = p[1:, :] - np.einsum("kji,kj->ki", F_T, p[:-1, :])
+    motion_diff = x_0[1:, :] - motion_bar[:-1]
+    der += np.einsum("ki,kij,kj->", factor_1, motion_cov_inv[:-1], motion_diff)
+
+    # Missing measurements (NaN) do not contribute
+    if isinstance(meas_bar, list):
+        # The meas. dim. varies with the time step (cf. `Model.map_set_batch`), the meas. term is summed per time step.
+        for k_ind in np.flatnonzero(obs):
+            H_T_k = np.linalg.solve(estimated_covs[k_ind], meas_psi[k_ind])
+            meas_diff_k = measurements[k_ind] - meas_bar[k_ind]
+            der -= p[k_ind] @ H_T_k @ meas_cov_inv[k_ind] @ meas_diff_k
+        return der
+
+    measurements, meas_cov_inv = np.asarray(measurements), np.asarray(meas_cov_inv)
+    H_T = np.linalg.solve(estimated_covs[obs], meas_psi[obs])
+    meas_diff = measurements[obs] - meas_bar[obs]
+    der -= np.einsum("ki,kij,kjl,kl->", p[obs], H_T, meas_cov_inv[obs], meas_diff)
 
     return der
 
 
 def slr_smoothing_cost_means(
-    traj, measurements, m_1_0, P_1_0_inv, estimated_covs, motion_fn, meas_fn, motion_cov_inv, meas_cov_inv, slr_method
+    traj, measurements, m_1_0, P_1_0_chol, estimated_covs, motion_fn, meas_fn, motion_cov_inv, meas_cov_inv, slr_method
 ):
     """Cost function for an optimisation problem used in the family of slr smoothers
 
@@ -123,28 +125,21 @@ def slr_smoothing_cost_means(
         measurements: measurements for a time sequence 1, ..., K
             represented as a list of length K of np.array(D_y,)
         m_1_0 (D_x,): Prior mean for time 1
-        P_1_0_inv (D_x, D_x): Inverse prior covariance for time 1
+        P_1_0_chol: Cholesky factorisation of the prior covariance for time 1, as returned by `scipy.linalg.cho_factor`
         estimated_covs: covs for a time sequence 1, ..., K
             represented as a np.array(K, D_x, D_x).
-        motion_fn: MotionModel.map_set,
-        meas_fn: MeasModel.map_set,
+        motion_fn: MotionModel.map_set_batch,
+        meas_fn: MeasModel.map_set_batch,
         motion_cov_inv: estimated inverse covariances (Omega_k + Q_k) for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_x, D_x)
+            represented as a np.array(K, D_x, D_x)
         meas_cov_inv: estimated inverse covariances (Lambda_k + R_k) for a time sequence 1, ..., K
-            represented as a list of length K of np.array(D_x, D_x)
+            represented as a np.array(K, D_y, D_y)
         slr_method: Slr
     """
-    motion_bar = [
-        slr_method.calc_z_bar(partial(motion_fn, time_step=k), mean_k, cov_k)
-        for (k, (mean_k, cov_k)) in enumerate(zip(traj, estimated_covs), 1)
-    ]
-
-    meas_bar = [
-        slr_method.calc_z_bar(partial(meas_fn, time_step=k), mean_k, cov_k)
-        for (k, (mean_k, cov_k)) in enumerate(zip(traj, estimated_covs), 1)
-    ]
+    motion_bar = slr_method.calc_z_bar_batch(motion_fn, traj, estimated_covs)
+    meas_bar = slr_method.calc_z_bar_batch(meas_fn, traj, estimated_covs)
     return slr_smoothing_cost_pre_comp(
-        traj, measurements, m_1_0, P_1_0_inv, motion_bar, meas_bar, motion_cov_inv, meas_cov_inv
+        traj, measurements, m_1_0, P_1_0_chol, motion_bar, meas_bar, motion_cov_inv, meas_cov_inv
     )
 
 
@@ -179,33 +174,36 @@ def slr_smoothing_cost(
         slr_method: Slr
     """
     prior_diff = traj[0, :] - m_1_0
-    _cost = prior_diff.T @ np.linalg.inv(P_1_0) @ prior_diff
+    _cost = prior_diff.T @ np.linalg.solve(P_1_0, prior_diff)
 
     motion_mapping = partial(motion_model.map_set, time_step=None)
     for k in range(0, traj.shape[0] - 1):
         mean_k = traj[k, :]
         cov_k = covs[k, :, :]
-        motion_bar, psi, phi = slr.slr(motion_mapping, mean_k, cov_k)
-        _, _, Omega_k = slr.linear_params_from_slr(mean_k, cov_k, motion_bar, psi, phi)
+        motion_bar, Omega_k = slr.calc_z_bar_and_error_cov(motion_mapping, mean_k, cov_k)
 
         motion_diff_k = traj[k + 1, :] - motion_bar
-        _cost += motion_diff_k.T @ np.linalg.inv(motion_model.proc_noise(k) + Omega_k) @ motion_diff_k
+        # Q_k + Omega_k is SPD
+        _cost += motion_diff_k.T @ cho_solve(cho_factor(motion_model.proc_noise(k) + Omega_k), motion_diff_k)
 
     meas_mapping = partial(meas_model.map_set, time_step=None)
-    for k in range(0, traj.shape[0]):
-        if any(np.isnan(measurements[k, :])):
-            continue
+    obs = ~np.isnan(measurements).any(axis=1)
+    for k in np.flatnonzero(obs):
         mean_k = traj[k, :]
         cov_k = covs[k, :]
-        meas_bar, psi, phi = slr.slr(meas_mapping, mean_k, cov_k)
-        _, _, Lambda_k = slr.linear_params_from_slr(mean_k, cov_k, meas_bar, psi, phi)
+        meas_bar, Lambda_k = slr.calc_z_bar_and_error_cov(meas_mapping, mean_k, cov_k)
 
         # measurements are zero indexed, i.e. meas[k-1] --> y_k
         meas_diff_k = measurements[k, :] - meas_bar
-        _cost += meas_diff_k.T @ np.linalg.inv(meas_model.meas_noise(k) + Lambda_k) @ meas_diff_k
+        _cost += meas_diff_k.T @ cho_solve(cho_factor(meas_model.meas_noise(k) + Lambda_k), meas_diff_k)
 
     return _cost
 
 
+def _observed(measurements):
+    """Mask (K,) of the time steps with a measurement, computed per element since the meas. dim. may vary"""
+    return np.array([not np.isnan(meas_k).any() for meas_k in measurements], dtype=bool)
+
+
 def slr_noop_cost(traj, motion_bar, meas_bar, motion_cov_inv, meas_cov_inv):
     return None
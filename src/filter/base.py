@@ -3,6 +3,7 @@ from abc import abstractmethod, ABC
 from functools import partial
 import logging
 import numpy as np
+from scipy.linalg.lapack import dpotrf, dpotrs, dtrtrs
 
 LOGGER = logging.getLogger(__name__)
 
@@ -124,12 +125,15 @@ class Filter(ABC):
         if not any(np.isnan(y_k)):
             H, c, Lambda = linearization
             y_mean = H @ m_k_kminus1 + c
-            S = H @ P_k_kminus1 @ H.T + R + Lambda
-            K = P_k_kminus1 @ H.T @ np.linalg.inv(S)
-
-            m_k_k = m_k_kminus1 + (K @ (y_k - y_mean)).reshape(m_k_kminus1.shape)
-            P_k_k = P_k_kminus1 - K @ S @ K.T
-            P_k_k = (P_k_k + P_k_k.T) / 2
+            HP = H @ P_k_kminus1
+            S = HP @ H.T + R + Lambda
+            # With S = L L^T and W = L^-1 H P, the gain is K = P H^T S^-1 = W^T L^-1, so
+            # K (y - y_mean) = W^T L^-1 (y - y_mean) and K S K^T = W^T W.
+            # The latter is symmetric by construction, so no symmetrisation of P_k_k is needed.
+            chol = _chol(S)
+            W = _lower_tri_solve(chol, HP)
+            m_k_k = m_k_kminus1 + _lower_tri_solve(chol, y_k - y_mean) @ W
+            P_k_k = P_k_kminus1 - W.T @ W
             return m_k_k, P_k_k
         else:
             return m_k_kminus1, P_k_kminus1
@@ -160,3 +164,38 @@ class Filter(ABC):
     @staticmethod
     def _mapping_with_time_step(mapping, time_step):
         return partial(mapping, time_step=time_step)
+
+
+def spd_solve(S, B):
+    """Solve S X = B for a symmetric positive definite S
+
+    Calls LAPACK's Cholesky routines directly,
+    since the input validation in `scipy.linalg.cho_factor/cho_solve` dominates the cost for the small matrices here.
+
+    Args:
+        S (D, D): symmetric positive definite matrix, only the lower triangle is used
+        B (D, N)
+
+    Returns:
+        X (D, N)
+    """
+    X, info = dpotrs(_chol(S), B, lower=1)
+    if info != 0:
+        raise np.linalg.LinAlgError(f"Cholesky solve failed, LAPACK dpotrs info: {info}")
+    return X
+
+
+def _chol(S):
+    """Lower Cholesky factor of a symmetric positive definite S"""
+    chol, info = dpotrf(S, lower=1)
+    if info != 0:
+        raise np.linalg.LinAlgError(f"Matrix is not positive definite, LAPACK dpotrf info: {info}")
+    return chol
+
+
+def _lower_tri_solve(L, B):
+    """Solve L X = B for a lower triangular L"""
+    X, info = dtrtrs(L, B, lower=1)
+    if info != 0:
+        raise np.linalg.LinAlgError(f"Singular triangular matrix, LAPACK dtrtrs info: {info}")
+    return X
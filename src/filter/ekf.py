@@ -1,5 +1,6 @@
 """Extended Kalman filter (EKF)"""
 from typing import Union
+import numpy as np
 from src.filter.base import Filter
 from src.models.base import Model, MotionModel, MeasModel, Differentiable
 
@@ -33,22 +34,110 @@ class Ekf(Filter):
 
 def ext_lin(model: Union[Model, Differentiable], mean, time_step):
     """First order Taylor Linearisation for the extended filters and smoother"""
-    jac = model.jacobian(mean, time_step)
-    offset = model.mapping(mean, time_step) - jac @ mean
+    mapped, jac = model.mapping_and_jacobian(mean, time_step)
+    offset = mapped - jac @ mean
     return jac, offset
 
 
+def ext_lin_traj(model: Union[Model, Differentiable], traj):
+    """First order Taylor Linearisation along a trajectory
+
+    Batched version of `ext_lin`, where the state x_k is linearised with time step k.
+
+    Args:
+        traj (K, D_x)
+
+    Returns:
+        jacs (K, D_y, D_x)
+        offsets (K, D_y)
+        or lists of K per time step arrays, if the model does not stack its Jacobians (cf. `Model.map_traj`).
+    """
+    jacs, mapped = model.jacobian_traj(traj), model.map_traj(traj)
+    if isinstance(jacs, list):
+        # The output dim. may vary with the time step, so the offsets are also computed per time step.
+        return jacs, [mapped_k - jac_k @ state for mapped_k, jac_k, state in zip(mapped, jacs, traj)]
+    offsets = mapped - np.einsum("kij,kj->ki", jacs, traj)
+    return jacs, offsets
+
+
 class ExtCache:
+    """Cache of the extended (first order Taylor) linearisations along a trajectory
+
+    The linearisations are computed lazily, on first access after an update.
+    The iterated smoothers update the cache with every accepted estimate, including the final one
+    which is never used for linearisation, and rejected LM/LS candidates never update the cache.
+
+    For time invariant models, only the time steps where the mean has changed since the linearisations
+    were last computed are relinearised, e.g. when the iterates have converged for parts of the trajectory.
+    """
+
     def __init__(self, motion_model, meas_model):
         self._motion_model = motion_model
         self._meas_model = meas_model
-        self.motion_lin = None
-        self.meas_lin = None
+        self._means = None
+        self._motion_lin = None
+        self._meas_lin = None
+        # Masks (K,) of the time steps to relinearise on next access
+        self._motion_upd = None
+        self._meas_upd = None
 
     def update(self, means, _covs):
-        self.motion_lin = [(*ext_lin(self._motion_model, mean_k, k), 0) for k, mean_k in enumerate(means, 1)]
-        self.meas_lin = [(*ext_lin(self._meas_model, mean_k, k), 0) for k, mean_k in enumerate(means, 1)]
+        changed = self._changed_time_steps(means)
+        if not changed.any():
+            return
+        self._means = means.copy()
+        self._motion_upd = _merge_upd(self._motion_upd, changed)
+        self._meas_upd = _merge_upd(self._meas_upd, changed)
+
+    @property
+    def motion_lin(self):
+        self._motion_lin = self._relinearise(self._motion_model, self._motion_lin, self._motion_upd)
+        self._motion_upd = None
+        return self._motion_lin
+
+    @property
+    def meas_lin(self):
+        self._meas_lin = self._relinearise(self._meas_model, self._meas_lin, self._meas_upd)
+        self._meas_upd = None
+        return self._meas_lin
+
+    def _relinearise(self, model, lin, upd):
+        """Linearisations with the time steps in the mask `upd` recomputed
+
+        The list `lin` is replaced, never modified in place, since it might be shared.
+        """
+        if upd is None:
+            return lin
+        if upd.all():
+            return [(jac, offset, 0) for jac, offset in zip(*ext_lin_traj(model, self._means))]
+        # Partial updates only occur for time invariant models, so the states can be linearised as a set.
+        jacs, offsets = ext_lin_traj(model, self._means[upd])
+        lin = list(lin)
+        for ind, k_ind in enumerate(np.flatnonzero(upd)):
+            lin[k_ind] = (jacs[ind], offsets[ind], 0)
+        return lin
+
+    def _changed_time_steps(self, means):
+        """Mask (K,) of the time steps where the means differ from the previous update
+
+        Partial updates require time invariant models, since the time steps of the states are not tracked.
+        """
+        partial_upd = (
+            self._means is not None
+            and self._means.shape == means.shape
+            and self._motion_model.time_invariant
+            and self._meas_model.time_invariant
+        )
+        if not partial_upd:
+            return np.ones((means.shape[0],), dtype=bool)
+        return ~(means == self._means).all(axis=1)
 
     def is_initialized(self):
-        # TODO: Full
-        return self.motion_lin is not None and self.meas_lin is not None
+        return self._means is not None
+
+
+def _merge_upd(pending, changed):
+    """Combine a pending update mask with the time steps changed since"""
+    if pending is None or changed.all():
+        return changed
+    return pending | changed
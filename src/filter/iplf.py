@@ -13,7 +13,7 @@ class SigmaPointIplf(Filter):
         self._slr = SigmaPointSlr(sigma_point_method)
         self._current_means = None
         self._current_covs = None
-        self._cache = SlrCache(self._motion_model.map_set, self._meas_model.map_set, self._slr)
+        self._cache = SlrCache(self._motion_model, self._meas_model, self._slr)
 
     def _update_estimates(self, means, covs, cache=None):
         self._current_means = means.copy()
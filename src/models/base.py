@@ -6,6 +6,10 @@ import numpy as np
 
 
 class Model(ABC):
+    # Time invariant models do not depend on the time step,
+    # which allows for mapping a full trajectory with `map_set`.
+    time_invariant = False
+
     @abstractmethod
     def mapping(self, state: np.ndarray, time_step: int) -> np.ndarray:
         """Vector to vector mapping
@@ -25,12 +29,78 @@ class Model(ABC):
         map_ = partial(self.mapping, time_step=time_step)
         return np.apply_along_axis(map_, axis=1, arr=states)
 
+    def map_set_batch(self, states: np.ndarray, time_steps: np.ndarray) -> np.ndarray:
+        """Map a sequence of state sets
+        Maps the set states[k] with time step time_steps[k], e.g. the sigma points of a whole trajectory.
+
+        Default impl. maps time invariant models in a single `map_set` call and loops over the sequence otherwise,
+        override if the time dependency can be vectorised.
+
+        states: Sequence of K sets of N states with dim. D_x, represented as a tensor R^(K, N, D_x)
+        time_steps: Time steps of the sets, R^(K,)
+
+        Returns:
+            mapped states R^(K, N, D_y)
+            As for `map_traj`, the default impl. returns a list of K np.array(N, D_y_k) for time variant models.
+        """
+        if self.time_invariant:
+            K, N, D_x = states.shape
+            return self.map_set(states.reshape((K * N, D_x)), None).reshape((K, N, -1))
+        return [self.map_set(states_k, k) for k, states_k in zip(time_steps, states)]
+
+    def map_traj(self, traj: np.ndarray) -> np.ndarray:
+        """Map a trajectory
+        Maps the states x_1, ..., x_K, where x_k is mapped with time step k.
+
+        traj: Trajectory of K states with dim. D_x, represented as a matrix R^(K, D_x)
+
+        Returns:
+            mapped states R^(K, D_y)
+            For time variant models, D_y may depend on k (e.g. `BearingsVaryingSensors`),
+            so the default impl. returns a list of K np.array(D_y_k,). Override if they can be stacked.
+        """
+        if self.time_invariant:
+            return self.map_set(traj)
+        return [self.mapping(state, k) for k, state in enumerate(traj, 1)]
+
 
 class Differentiable(ABC):
     @abstractmethod
     def jacobian(self, state, time_step: Optional[int]) -> np.ndarray:
         pass
 
+    def mapping_and_jacobian(self, state, time_step: Optional[int]):
+        """Mapping and Jacobian evaluated at the same state
+
+        Equivalent to `(self.mapping(state, time_step), self.jacobian(state, time_step))`.
+        Override if the two can share computations.
+        """
+        return self.mapping(state, time_step), self.jacobian(state, time_step)
+
+    def jacobian_set(self, states: np.ndarray, time_step: Optional[int] = None) -> np.ndarray:
+        """Jacobians of multiple states
+
+        states: Set of N states with dim. D_x, represented as a matrix R^(N, D_x)
+
+        Returns:
+            jacobians (N, D_y, D_x)
+        """
+        return np.array([self.jacobian(state, time_step) for state in states])
+
+    def jacobian_traj(self, traj: np.ndarray) -> np.ndarray:
+        """Jacobians along a trajectory
+        The Jacobian at x_k is evaluated with time step k, cf. `Model.map_traj`.
+
+        traj: Trajectory of K states with dim. D_x, represented as a matrix R^(K, D_x)
+
+        Returns:
+            jacobians (K, D_y, D_x)
+            As for `Model.map_traj`, the default impl. returns a list of K np.array(D_y_k, D_x) for time variant models.
+        """
+        if self.time_invariant:
+            return self.jacobian_set(traj)
+        return [self.jacobian(state, k) for k, state in enumerate(traj, 1)]
+
 
 class MeasModel(Model):
     @abstractmethod
@@ -2,6 +2,7 @@
 https://www.researchgate.net/publication/4221183_Comparison_and_choice_of_models_in_tracking_target_with_coordinated_turn_motion
 """
 
+import math
 import numpy as np
 from src.models.base import MotionModel, Differentiable
 
@@ -18,59 +19,60 @@ class CoordTurn(MotionModel, Differentiable):
         ]
     """
 
+    time_invariant = True
+
     def __init__(self, sampling_period, proc_noise):
         self._dt = sampling_period
         self._proc_noise = proc_noise
 
     def mapping(self, state, time_step=None):
         dt = self._dt
-        w = state[4]
-        if w == 0:
-            coswt = np.cos(w * dt)
-            coswto = np.cos(w * dt) - 1
-            coswtopw = 0
-            sinwt = np.sin(w * dt)
-            sinwtpw = dt
-        else:
-            coswt = np.cos(w * dt)
-            coswto = np.cos(w * dt) - 1
-            coswtopw = coswto / w
-            sinwt = np.sin(w * dt)
-            sinwtpw = sinwt / w
-
-        F = np.array(
+        w = float(state[4])
+        coswt = math.cos(w * dt)
+        sinwt = math.sin(w * dt)
+        coswtopw = _coswtopw(w, dt, coswt)
+        sinwtpw = _sinwtpw(w, dt, sinwt)
+
+        x, y, vx, vy, _ = state
+        return np.array(
             [
-                [1, 0, sinwtpw, -coswtopw, 0],
-                [0, 1, coswtopw, sinwtpw, 0],
-                [0, 0, coswt, sinwt, 0],
-                [0, 0, -sinwt, coswt, 0],
-                [0, 0, 0, 0, 1],
+                x + sinwtpw * vx - coswtopw * vy,
+                y + coswtopw * vx + sinwtpw * vy,
+                coswt * vx + sinwt * vy,
+                -sinwt * vx + coswt * vy,
+                w,
             ]
         )
-        return F @ state
+
+    def map_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs"""
+        dt = self._dt
+        w = states[:, 4]
+        coswt = np.cos(w * dt)
+        sinwt = np.sin(w * dt)
+        coswtopw = _coswtopw(w, dt, coswt)
+        sinwtpw = _sinwtpw(w, dt, sinwt)
+
+        mapped = np.empty(states.shape)
+        mapped[:, 0] = states[:, 0] + sinwtpw * states[:, 2] - coswtopw * states[:, 3]
+        mapped[:, 1] = states[:, 1] + coswtopw * states[:, 2] + sinwtpw * states[:, 3]
+        mapped[:, 2] = coswt * states[:, 2] + sinwt * states[:, 3]
+        mapped[:, 3] = -sinwt * states[:, 2] + coswt * states[:, 3]
+        mapped[:, 4] = w
+        return mapped
 
     def proc_noise(self, _k):
         return self._proc_noise
 
     def jacobian(self, state, _time_step):
         dt = self._dt
-        w = state[4]
-        if w == 0:
-            coswt = 1
-            coswto = 0
-            coswtopw = 0
-            sinwt = 0
-            sinwtpw = dt
-            dsinwtpw = 0
-            dcoswtopw = -0.5 * dt ** 2
-        else:
-            coswt = np.cos(w * dt)
-            coswto = np.cos(w * dt) - 1
-            coswtopw = coswto / w
-            sinwt = np.sin(w * dt)
-            sinwtpw = sinwt / w
-            dsinwtpw = (w * dt * coswt - sinwt) / (w ** 2)
-            dcoswtopw = (-w * dt * sinwt - coswto) / (w ** 2)
+        w = float(state[4])
+        coswt = math.cos(w * dt)
+        sinwt = math.sin(w * dt)
+        coswtopw = _coswtopw(w, dt, coswt)
+        sinwtpw = _sinwtpw(w, dt, sinwt)
+        dsinwtpw = _dsinwtpw(w, dt, coswt, sinwt)
+        dcoswtopw = _dcoswtopw(w, dt, coswt, sinwt)
         jac = np.zeros((5, 5))
         jac[0, 0] = 1
         jac[0, 2] = sinwtpw
@@ -88,3 +90,110 @@ class CoordTurn(MotionModel, Differentiable):
         jac[3, 4] = -dt * coswt * state[2] - dt * sinwt * state[3]
         jac[4, 4] = 1
         return jac
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs"""
+        dt = self._dt
+        w = states[:, 4]
+        coswt = np.cos(w * dt)
+        sinwt = np.sin(w * dt)
+        coswtopw = _coswtopw(w, dt, coswt)
+        sinwtpw = _sinwtpw(w, dt, sinwt)
+        dsinwtpw = _dsinwtpw(w, dt, coswt, sinwt)
+        dcoswtopw = _dcoswtopw(w, dt, coswt, sinwt)
+        jacs = np.zeros((states.shape[0], 5, 5))
+        jacs[:, 0, 0] = 1
+        jacs[:, 0, 2] = sinwtpw
+        jacs[:, 0, 3] = -coswtopw
+        jacs[:, 0, 4] = dsinwtpw * states[:, 2] - dcoswtopw * states[:, 3]
+        jacs[:, 1, 1] = 1
+        jacs[:, 1, 2] = coswtopw
+        jacs[:, 1, 3] = sinwtpw
+        jacs[:, 1, 4] = dcoswtopw * states[:, 2] + dsinwtpw * states[:, 3]
+        jacs[:, 2, 2] = coswt
+        jacs[:, 2, 3] = sinwt
+        jacs[:, 2, 4] = -dt * sinwt * states[:, 2] + dt * coswt * states[:, 3]
+        jacs[:, 3, 2] = -sinwt
+        jacs[:, 3, 3] = coswt
+        jacs[:, 3, 4] = -dt * coswt * states[:, 2] - dt * sinwt * states[:, 3]
+        jacs[:, 4, 4] = 1
+        return jacs
+
+    def mapping_and_jacobian(self, state, time_step=None):
+        """Overrides the base class impl. to share the trig. evaluations
+
+        The mapping is linear in the first four state components (position and velocity),
+        with coefficients equal to the corresponding columns of the Jacobian.
+        The turn rate is mapped to itself.
+        """
+        jac = self.jacobian(state, time_step)
+        mapped = jac[:, :4] @ state[:4]
+        mapped[4] = state[4]
+        return mapped, jac
+
+
+# The functions of w below are evaluated with their Taylor expansions around w = 0 when |w dt| is below this limit,
+# which avoids branching on w == 0 and the 0 / 0 in the closed form expressions.
+# The limit is kept small, since the closed forms match the reference (matlab) implementation.
+# The trig. values cos(w dt) and sin(w dt) are passed in, so that they are only computed once per state.
+# Scalar w (a float, in the single state mapping and Jacobian) takes a plain branch instead,
+# np.where dominates the cost of those calls and a type check is cheaper than np.ndim.
+_TAYLOR_LIM = 1e-8
+
+
+def _sinwtpw(w, dt, sinwt):
+    """sin(w dt) / w"""
+    if isinstance(w, float):
+        return dt - w ** 2 * dt ** 3 / 6 if abs(w * dt) < _TAYLOR_LIM else sinwt / w
+    small = np.abs(w * dt) < _TAYLOR_LIM
+    return np.where(small, dt - w ** 2 * dt ** 3 / 6, sinwt / np.where(small, 1.0, w))
+
+
+def _coswtopw(w, dt, coswt):
+    """(cos(w dt) - 1) / w"""
+    if isinstance(w, float):
+        return -w * dt ** 2 / 2 if abs(w * dt) < _TAYLOR_LIM else (coswt - 1) / w
+    small = np.abs(w * dt) < _TAYLOR_LIM
+    return np.where(small, -w * dt ** 2 / 2, (coswt - 1) / np.where(small, 1.0, w))
+
+
+def _dsinwtpw(w, dt, coswt, sinwt):
+    """d/dw sin(w dt) / w"""
+    if isinstance(w, float):
+        return -w * dt ** 3 / 3 if abs(w * dt) < _TAYLOR_LIM else (w * dt * coswt - sinwt) / w ** 2
+    small = np.abs(w * dt) < _TAYLOR_LIM
+    w_safe = np.where(small, 1.0, w)
+    return np.where(small, -w * dt ** 3 / 3, (w_safe * dt * coswt - sinwt) / w_safe ** 2)
+
+
+def _dcoswtopw(w, dt, coswt, sinwt):
+    """d/dw (cos(w dt) - 1) / w"""
+    if isinstance(w, float):
+        if abs(w * dt) < _TAYLOR_LIM:
+            return -(dt ** 2) / 2 + w ** 2 * dt ** 4 / 8
+        return (-w * dt * sinwt - (coswt - 1)) / w ** 2
+    small = np.abs(w * dt) < _TAYLOR_LIM
+    w_safe = np.where(small, 1.0, w)
+    return np.where(small, -(dt ** 2) / 2 + w ** 2 * dt ** 4 / 8, (-w_safe * dt * sinwt - (coswt - 1)) / w_safe ** 2)
+
+
+def coord_turn_proc_noise(dt, qc, qw):
+    """Process noise covariance for the coord. turn model
+
+    Continuous white noise acceleration, with spectral density qc, in the position and velocity components
+    and a random walk, with spectral density qw, in the turn rate.
+
+    Args:
+        dt: sampling period
+        qc: spectral density of the acceleration noise
+        qw: spectral density of the turn rate noise
+
+    Returns:
+        Q (5, 5)
+    """
+    Q = np.zeros((5, 5))
+    Q[[0, 1], [0, 1]] = qc * dt ** 3 / 3
+    Q[[2, 3], [2, 3]] = qc * dt
+    Q[[0, 1, 2, 3], [2, 3, 0, 1]] = qc * dt ** 2 / 2
+    Q[4, 4] = dt * qw
+    return Q
@@ -9,16 +9,29 @@ class Cubic(MeasModel, Differentiable):
         x_k = actual state at time step k
     """
 
+    time_invariant = True
+
     def __init__(self, coeff: float, meas_noise):
         # Rename? 'scale' perhaps
         self.coeff = coeff
         self._meas_noise = np.atleast_2d(meas_noise)
 
     def mapping(self, state, time_step=None):
-        return state ** 3 * self.coeff
+        # Explicit products, cheaper than the general power ufunc
+        return state * state * state * self.coeff
+
+    def map_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs
+        The mapping is elementwise, so the states are mapped in a single call.
+        """
+        return self.mapping(states, time_step)
 
     def meas_noise(self, _time_step):
         return self._meas_noise
 
     def jacobian(self, state, time_step=None):
-        return np.atleast_2d(3 * state ** 2 * self.coeff)
+        return np.reshape(3 * self.coeff * state * state, (1, 1))
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs"""
+        return (3 * self.coeff * states * states).reshape((-1, 1, 1))
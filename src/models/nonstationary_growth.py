@@ -23,10 +23,35 @@ class NonStationaryGrowth(MotionModel, Differentiable):
         term_3 = self.gamma * np.cos(self.delta * time_step)
         return term_1 + term_2 + term_3
 
+    def map_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs
+        The mapping is elementwise, so the states are mapped in a single call.
+        """
+        return self.mapping(states, time_step)
+
+    def map_set_batch(self, states, time_steps):
+        """Vectorised over the sequence, see base class for full docs"""
+        time_term = self.gamma * np.cos(self.delta * np.asarray(time_steps, dtype=float))
+        return self.alpha * states + self.beta * states / (1 + states ** 2) + time_term[:, np.newaxis, np.newaxis]
+
+    def map_traj(self, traj):
+        """Vectorised over the trajectory, see base class for full docs"""
+        return self.map_set_batch(traj[:, np.newaxis, :], np.arange(1, traj.shape[0] + 1))[:, 0, :]
+
     def proc_noise(self, _time_step):
         return self._proc_noise
 
     def jacobian(self, state, time_step=None):
+        return np.reshape(self._derivative(state), (1, 1))
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs"""
+        return self._derivative(states).reshape((-1, 1, 1))
+
+    def jacobian_traj(self, traj):
+        """The Jacobian has no explicit time dependency, see base class for full docs"""
+        return self.jacobian_set(traj)
+
+    def _derivative(self, state):
         state_sq = state ** 2
-        derivative = self.alpha + self.beta * (1 - state_sq) / (1 + state_sq) ** 2
-        return derivative.reshape((1, 1))
+        return self.alpha + self.beta * (1 - state_sq) / (1 + state_sq) ** 2
@@ -9,6 +9,8 @@ class Quadratic(MeasModel, Differentiable):
         x_k = actual state at time step k
     """
 
+    time_invariant = True
+
     def __init__(self, coeff: float, meas_noise):
         # Rename? 'scale' perhaps
         self.coeff = coeff
@@ -17,8 +19,18 @@ class Quadratic(MeasModel, Differentiable):
     def mapping(self, state, time_step=None):
         return state ** 2 * self.coeff
 
+    def map_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs
+        The mapping is elementwise, so the states are mapped in a single call.
+        """
+        return self.mapping(states, time_step)
+
     def meas_noise(self, _time_step):
         return self._meas_noise
 
     def jacobian(self, state, _time_step=None):
-        return np.atleast_2d(2 * state * self.coeff)
+        return np.reshape(2 * state * self.coeff, (1, 1))
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over the states, see base class for full docs"""
+        return (2 * states * self.coeff).reshape((-1, 1, 1))
@@ -1,4 +1,5 @@
 """Range bearing meas model"""
+import math
 import numpy as np
 from src.models.base import MeasModel, Differentiable
 from scipy.stats import multivariate_normal as mvn
@@ -7,12 +8,14 @@ from scipy.stats import multivariate_normal as mvn
 class RangeBearing(MeasModel, Differentiable):
     """pos np.array(2,)"""
 
+    time_invariant = True
+
     def __init__(self, pos, meas_noise):
         self.pos = pos
         self._meas_noise = meas_noise
 
     def mapping(self, state, time_step=None):
-        range_ = _euclid_dist(state[:2], self.pos)
+        range_ = _euclid_dist(state, self.pos)
         bearing = _angle(state, self.pos)
         return np.array([range_, bearing])
 
@@ -20,39 +23,61 @@ class RangeBearing(MeasModel, Differentiable):
         return self._meas_noise
 
     def jacobian(self, state, time_step=None):
-        x, y = state[0], state[1]
-        s_x, s_y = self.pos[0], self.pos[1]
-        delta_x, delta_y = x - s_x, y - s_y
-
-        range_derivative = _euclid_dist_jacobian(delta_x, delta_y)
-        bearings_derivative = _angle_jacobian(delta_x, delta_y)
-        non_zero = np.row_stack((range_derivative, bearings_derivative))
+        delta_x, delta_y = state[0] - self.pos[0], state[1] - self.pos[1]
+        range_sq = delta_x ** 2 + delta_y ** 2
+        range_ = math.sqrt(range_sq)
 
-        return np.column_stack((non_zero, np.zeros((2, 3))))
+        jac = np.zeros((2, state.shape[0]))
+        jac[0, 0] = delta_x / range_
+        jac[0, 1] = delta_y / range_
+        jac[1, 0] = -delta_y / range_sq
+        jac[1, 1] = delta_x / range_sq
+        return jac
 
 
 class MultiSensorRange(MeasModel, Differentiable):
+    time_invariant = True
+
     def __init__(self, sensors, meas_noise):
         """
         Num. sensors = N
         sensors (np.ndarray): (N, D_y)
         """
-        self.sensors = sensors
+        self.sensors = np.asarray(sensors, dtype=float)
         self._meas_noise = meas_noise
 
     def mapping(self, state, time_step=None):
-        return np.apply_along_axis(lambda pos: _euclid_dist(state[:2], pos), axis=1, arr=self.sensors)
+        return self.map_set(state[np.newaxis, :], time_step)[0]
 
     def meas_noise(self, time_step):
         return self._meas_noise
 
     def jacobian(self, state, time_step=None):
-        zeros_len = state.shape[0] - 2
-        x, y = state[0], state[1]
-        non_zero = np.apply_along_axis(
-            lambda pos: _euclid_dist_jacobian(x - pos[0], y - pos[1]), axis=1, arr=self.sensors
-        )
-        return np.column_stack((non_zero, np.zeros((2, zeros_len))))
+        return self.jacobian_set(state[np.newaxis, :], time_step)[0]
+
+    def map_set(self, states, time_step=None):
+        """Vectorised over states and sensors, see base class for full docs"""
+        _, dist = self._sensor_deltas(states)
+        return dist
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over states and sensors, see base class for full docs"""
+        num_states, D_x = states.shape
+        delta, dist = self._sensor_deltas(states)
+        jac = np.zeros((num_states, self.sensors.shape[0], D_x))
+        jac[:, :, :2] = delta / dist[:, :, np.newaxis]
+        return jac
+
+    def _sensor_deltas(self, states):
+        """Position differences to, and distances from, all sensors
+
+        Returns:
+            delta: (N, num_sensors, 2)
+            dist: (N, num_sensors)
+        """
+        delta = states[:, np.newaxis, :2] - self.sensors
+        # The sum of squares as a single reduction, without a squared temporary.
+        return delta, np.sqrt(np.einsum("nsi,nsi->ns", delta, delta))
 
     def sample(self, states):
         means = self.map_set(states)
@@ -62,26 +87,41 @@ class MultiSensorRange(MeasModel, Differentiable):
 
 
 class MultiSensorBearings(MeasModel, Differentiable):
+    time_invariant = True
+
     def __init__(self, sensors, meas_noise):
         """
         Num. sensors = N
         sensors (np.ndarray): (N, D_y)
         """
-        self.sensors = sensors
+        self.sensors = np.asarray(sensors, dtype=float)
         self._meas_noise = meas_noise
 
     def mapping(self, state, time_step=None):
-        return np.apply_along_axis(lambda pos: _angle(state[:2], pos), axis=1, arr=self.sensors)
+        return self.map_set(state[np.newaxis, :], time_step)[0]
+
+    def map_set(self, states, time_step=None):
+        """Vectorised over states and sensors, see base class for full docs"""
+        # (N, num_sensors, 2)
+        delta = states[:, np.newaxis, :2] - self.sensors
+        return np.arctan2(delta[:, :, 1], delta[:, :, 0])
 
     def meas_noise(self, time_step):
         return self._meas_noise
 
     def jacobian(self, state, time_step=None):
-        zeros_len = state.shape[0] - 2
-        x, y = state[0], state[1]
-        non_zero = np.apply_along_axis(lambda pos: _angle_jacobian(x - pos[0], y - pos[1]), axis=1, arr=self.sensors)
-
-        return np.column_stack((non_zero, np.zeros((self.sensors.shape[0], zeros_len))))
+        return self.jacobian_set(state[np.newaxis, :], time_step)[0]
+
+    def jacobian_set(self, states, time_step=None):
+        """Vectorised over states and sensors, see base class for full docs"""
+        num_states, D_x = states.shape
+        # (N, num_sensors, 2)
+        delta = states[:, np.newaxis, :2] - self.sensors
+        den = (delta ** 2).sum(axis=2)
+        jac = np.zeros((num_states, self.sensors.shape[0], D_x))
+        jac[:, :, 0] = -delta[:, :, 1] / den
+        jac[:, :, 1] = delta[:, :, 0] / den
+        return jac
 
     def sample(self, states):
         means = self.map_set(states)
@@ -128,36 +168,28 @@ class BearingsVaryingSensors(MeasModel, Differentiable):
 
 
 def _euclid_dist(p_1, p_2):
-    return np.sqrt(np.sum((p_1 - p_2) ** 2))
-
-
-def _euclid_dist_jacobian(x, y):
-    den = np.sqrt(x ** 2 + y ** 2)
-    return np.array([x / den, y / den])
+    return math.hypot(p_1[0] - p_2[0], p_1[1] - p_2[1])
 
 
 def _angle(p_1, p_2):
     delta_x = p_1[0] - p_2[0]
     delta_y = p_1[1] - p_2[1]
-    return np.arctan2(delta_y, delta_x)
-
-
-def _angle_jacobian(x, y):
-    den = x ** 2 + y ** 2
-    return np.array([-y / den, x / den])
+    return math.atan2(delta_y, delta_x)
 
 
 def to_cartesian_coords(meas, pos):
-    """Maps a range and bearing measurement to cartesian coords
+    """Maps range and bearing measurements to cartesian coords
+
+    Vectorised over the leading dimensions, i.e. works for both a single meas. and a meas. sequence.
 
     Args:
-        meas np.array(D_y,)
+        meas np.array(D_y,) or np.array(K, D_y), or a sequence of K meas.
         pos np.array(2,)
 
     Returns:
-        coords np.array(2,)
+        coords np.array(2,) or np.array(K, 2)
     """
-    delta_x = meas[0] * np.cos(meas[1])
-    delta_y = meas[0] * np.sin(meas[1])
-    coords = np.array([delta_x, delta_y]) + pos
-    return coords
+    meas = np.asarray(meas)
+    range_, bearing = meas[..., 0], meas[..., 1]
+    delta = np.stack((range_ * np.cos(bearing), range_ * np.sin(bearing)), axis=-1)
+    return delta + pos
@@ -1,5 +1,6 @@
 """Statistical linear regression (SLR) with sigma points"""
 from abc import ABC, abstractmethod
+from functools import lru_cache
 import numpy as np
 from scipy.linalg import sqrtm
 
@@ -9,6 +10,20 @@ class SigmaPointMethod(ABC):
     def gen_sigma_points(self, mean, cov):
         pass
 
+    def gen_sigma_points_batch(self, means, covs):
+        """Sigma points for a sequence of distributions
+
+        Args:
+            means (K, D_x)
+            covs (K, D_x, D_x)
+
+        Returns:
+            sigma_points (K, N, D_x)
+            weights (N,): The weights are assumed to be independent of the distribution.
+        """
+        sigma_points, weights = zip(*[self.gen_sigma_points(mean, cov) for mean, cov in zip(means, covs)])
+        return np.array(sigma_points), weights[0]
+
 
 class SphericalCubature(SigmaPointMethod):
     def gen_sigma_points(_self, mean, cov):
@@ -22,8 +37,20 @@ class SphericalCubature(SigmaPointMethod):
             sigma_points[2 * dim, :] = mean + np.sqrt(D_x) * sqrt_cov[:, dim]
             sigma_points[2 * dim + 1, :] = mean - np.sqrt(D_x) * sqrt_cov[:, dim]
 
-        weights = np.ones((num_sigma_points,)) / num_sigma_points
-        return sigma_points, weights
+        return sigma_points, _uniform_weights(num_sigma_points)
+
+    def gen_sigma_points_batch(_self, means, covs):
+        K, D_x = means.shape
+        scaled_sqrt_covs = np.sqrt(D_x) * _sqrtm_batch(covs)
+        num_sigma_points = 2 * D_x
+
+        # The columns of the sqrt cov's, i.e. rows of the transpose, are the offsets from the mean
+        offsets = np.transpose(scaled_sqrt_covs, (0, 2, 1))
+        sigma_points = np.empty((K, num_sigma_points, D_x))
+        sigma_points[:, 0::2, :] = means[:, np.newaxis, :] + offsets
+        sigma_points[:, 1::2, :] = means[:, np.newaxis, :] - offsets
+
+        return sigma_points, _uniform_weights(num_sigma_points)
 
 
 class UnscentedTransform(SigmaPointMethod):
@@ -62,5 +89,46 @@ class UnscentedTransform(SigmaPointMethod):
             sigma_points[dim + 1, :] = mean + np.sqrt(D_x + lambda_) * sqrt_cov[:, dim]
             sigma_points[D_x + dim + 1, :] = mean - np.sqrt(D_x + lambda_) * sqrt_cov[:, dim]
 
-        weights = np.ones((num_sigma_points,)) / num_sigma_points
-        return sigma_points, weights
+        return sigma_points, _uniform_weights(num_sigma_points)
+
+    def gen_sigma_points_batch(self, means, covs):
+        K, D_x = means.shape
+        lambda_ = self.lambda_(D_x)
+        scaled_sqrt_covs = np.sqrt(D_x + lambda_) * _sqrtm_batch(covs)
+        num_sigma_points = 2 * D_x + 1
+
+        offsets = np.transpose(scaled_sqrt_covs, (0, 2, 1))
+        sigma_points = np.empty((K, num_sigma_points, D_x))
+        sigma_points[:, 0, :] = means
+        sigma_points[:, 1 : D_x + 1, :] = means[:, np.newaxis, :] + offsets
+        sigma_points[:, D_x + 1 :, :] = means[:, np.newaxis, :] - offsets
+
+        return sigma_points, _uniform_weights(num_sigma_points)
+
+
+@lru_cache(maxsize=None)
+def _uniform_weights(num_sigma_points):
+    """Equal weights for all sigma points
+
+    The weights only depend on the number of sigma points, so they are created once and shared.
+    The array is read-only since it is shared between all calls.
+    """
+    weights = np.ones((num_sigma_points,)) / num_sigma_points
+    weights.flags.writeable = False
+    return weights
+
+
+def _sqrtm_batch(covs):
+    """Principal square root of a stack of symmetric PSD matrices
+
+    Batched equivalent of `scipy.linalg.sqrtm`, through the eigen decomposition.
+
+    Args:
+        covs (K, D_x, D_x)
+
+    Returns:
+        sqrt_covs (K, D_x, D_x)
+    """
+    eig_vals, eig_vecs = np.linalg.eigh(covs)
+    sqrt_eig_vals = np.sqrt(np.clip(eig_vals, 0.0, None))
+    return (eig_vecs * sqrt_eig_vals[:, np.newaxis, :]) @ np.transpose(eig_vecs, (0, 2, 1))
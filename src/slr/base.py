@@ -13,9 +13,11 @@ class Slr(ABC):
                 I.e., fn: R^Nxn -> R^Nxm
             mean: mean, R^n
             cov: covaraiance, R^(n x n)
+
+        Note: mean and cov must be arrays of rank 1 and 2 respectively (also for n = 1),
+        scalars are not promoted.
         """
 
-        mean, cov = np.atleast_1d(mean), np.atleast_2d(cov)
         z_bar, psi, phi = self.slr(fn, mean, cov)
         return self.linear_params_from_slr(mean, cov, z_bar, psi, phi)
 
@@ -37,16 +39,92 @@ class Slr(ABC):
             phi: Cov(z, z) R^(m x m)
         """
 
-        A = psi.T @ np.linalg.inv(cov)
+        # A = psi^T cov^-1, with a solve rather than an explicit inverse.
+        # (For the small matrices here, np.linalg.solve has less overhead than scipy's Cholesky routines.)
+        A = np.linalg.solve(cov, psi).T
         b = z_bar - A @ mean
-        Sigma = phi - A @ cov @ A.T
+        # A cov A^T = psi^T cov^-1 psi = A psi
+        Sigma = phi - A @ psi
         return A, b, Sigma
 
+    @staticmethod
+    def linear_params_from_slr_batch(means, covs, z_bars, psis, phis):
+        """Batched version of `linear_params_from_slr`
+
+        Args:
+            means: means, R^(K x n)
+            covs: covariances, R^(K x n x n)
+            z_bars: mapped means R^(K x m)
+            psis: Cov(x, z) R^(K x n x m)
+            phis: Cov(z, z) R^(K x m x m)
+
+        Returns:
+            As: R^(K x m x n)
+            bs: R^(K x m)
+            Sigmas: R^(K x m x m)
+        """
+
+        As = np.transpose(np.linalg.solve(covs, psis), (0, 2, 1))
+        bs = z_bars - np.einsum("kij,kj->ki", As, means)
+        Sigmas = phis - As @ psis
+        return As, bs, Sigmas
+
+    def calc_z_bar_and_error_cov(self, fn, mean, cov):
+        """Compute SLR quantity z_bar and the linearisation error covariance
+
+        Semantically identical to
+        `z_bar, psi, phi = self.slr(fn, mean, cov)`
+        `_, _, Sigma = self.linear_params_from_slr(mean, cov, z_bar, psi, phi)`
+        but skips the affine params A, b, for when only the error covariance is needed.
+
+        Returns:
+            z_bar: mapped mean E(z = fn(x)) R^m
+            Sigma: linearisation error covariance R^(m x m)
+        """
+        z_bar, psi, phi = self.slr(fn, mean, cov)
+        return z_bar, phi - psi.T @ np.linalg.solve(cov, psi)
+
     @abstractmethod
     def slr(self, fn, mean, cov):
         """Compute SLR quantities z_bar, psi, phi."""
         pass
 
+    def slr_batch(self, fn, means, covs):
+        """Compute SLR quantities z_bar, psi, phi for a sequence of distributions
+
+        Default impl. loops over the sequence, override if the SLR method can be vectorised.
+
+        Args:
+            fn: batched state mapping fn(states, time_steps), R^(K x N x n) -> R^(K x N x m), e.g. `Model.map_set_batch`
+            means: means for time steps 1, ..., K, R^(K x n)
+            covs: covariances for time steps 1, ..., K, R^(K x n x n)
+
+        Returns:
+            z_bars: R^(K x m)
+            psis: R^(K x n x m)
+            phis: R^(K x m x m)
+        """
+        slrs = [self.slr(_time_step_fn(fn, k), mean_k, cov_k) for k, (mean_k, cov_k) in enumerate(zip(means, covs), 1)]
+        z_bars, psis, phis = zip(*slrs)
+        return np.array(z_bars), np.array(psis), np.array(phis)
+
+    def slr_batch_multi(self, fns, means, covs):
+        """Compute SLR quantities for several mappings of the same sequence of distributions
+
+        Semantically identical to
+        `[self.slr_batch(fn, means, covs) for fn in fns]`
+        Override if the SLR method can share computations between the mappings, e.g. the sigma points.
+
+        Args:
+            fns: sequence of batched state mappings fn(states, time_steps), e.g. `Model.map_set_batch`
+            means: means for time steps 1, ..., K, R^(K x n)
+            covs: covariances for time steps 1, ..., K, R^(K x n x n)
+
+        Returns:
+            list of (z_bars, psis, phis), one per mapping, see `slr_batch`
+        """
+        return [self.slr_batch(fn, means, covs) for fn in fns]
+
     @abstractmethod
     def calc_z_bar(self, fn, mean, cov):
         """Compute SLR quantity z_bar
@@ -57,44 +135,127 @@ class Slr(ABC):
         """
         pass
 
+    def calc_z_bar_batch(self, fn, means, covs):
+        """Compute SLR quantity z_bar for a sequence of distributions
+
+        Default impl. loops over the sequence, override if the SLR method can be vectorised.
+
+        Args:
+            fn: batched state mapping fn(states, time_steps), R^(K x N x n) -> R^(K x N x m), e.g. `Model.map_set_batch`
+            means: means for time steps 1, ..., K, R^(K x n)
+            covs: covariances for time steps 1, ..., K, R^(K x n x n)
+
+        Returns:
+            z_bars: R^(K x m)
+        """
+        return np.array(
+            [
+                self.calc_z_bar(_time_step_fn(fn, k), mean_k, cov_k)
+                for k, (mean_k, cov_k) in enumerate(zip(means, covs), 1)
+            ]
+        )
+
 
 class SlrCache:
     def __init__(self, motion_model, meas_model, slr_method):
         self._motion_model = motion_model
         self._meas_model = meas_model
         self._slr = slr_method
+        # The batched SLR assumes that the output dims. do not vary with the time step.
+        self._time_invariant = motion_model.time_invariant and meas_model.time_invariant
         self.proc_lin = None
         self.meas_lin = None
         self.proc_bar = None
         self.meas_bar = None
+        self.proc_cov_inv = None
+        self.meas_cov_inv = None
+        # The estimates of the latest update, used to only recompute the SLR for the time steps which have changed.
+        self._means = None
+        self._covs = None
 
     def update(self, means, covs):
-        # TODO: single calc of sigma points.
-        proc_slr = [
-            self._slr.slr(partial(self._motion_model.map_set, time_step=k), mean_k, cov_k)
-            for (k, (mean_k, cov_k)) in enumerate(zip(means, covs), 1)
-        ]
-        self.proc_lin = [
-            self._slr.linear_params_from_slr(mean_k, cov_k, *slr_) for mean_k, cov_k, slr_ in zip(means, covs, proc_slr)
-        ]
-        self.proc_cov_inv = [
-            np.linalg.inv(self._motion_model.proc_noise(k) + lin_cov)
-            for k, (_, _, lin_cov) in enumerate(self.proc_lin, 1)
-        ]
-        self.proc_bar = np.array([z_bar for z_bar, _, _ in proc_slr])
+        """Update the SLR quantities for the estimates (means, covs)
 
-        meas_slr = [
-            self._slr.slr(partial(self._meas_model.map_set, time_step=k), mean_k, cov_k)
-            for (k, (mean_k, cov_k)) in enumerate(zip(means, covs), 1)
-        ]
-        self.meas_lin = [
-            self._slr.linear_params_from_slr(mean_k, cov_k, *slr_) for mean_k, cov_k, slr_ in zip(means, covs, meas_slr)
-        ]
-        self.meas_cov_inv = [
-            np.linalg.inv(self._meas_model.meas_noise(k) + lin_cov)
-            for k, (_, _, lin_cov) in enumerate(self.meas_lin, 1)
+        Only the time steps where the estimates differ from the ones of the previous update are recomputed
+        (e.g. when an iterated smoother is given back its current estimates).
+        The stored arrays are replaced, never modified in place, since they might be shared, e.g. by cost fns.
+        """
+        upd = self._changed_time_steps(means, covs)
+        if not upd.any():
+            return
+        upd_means, upd_covs = means[upd], covs[upd]
+        upd_tss = np.flatnonzero(upd) + 1
+
+        if self._time_invariant:
+            # Motion and meas. SLR are w.r.t. the same distributions, e.g. the sigma points are only computed once.
+            proc_slr, meas_slr = self._slr.slr_batch_multi(
+                (self._motion_model.map_set_batch, self._meas_model.map_set_batch), upd_means, upd_covs
+            )
+        else:
+            # The output dims. may vary with the time step (e.g. `BearingsVaryingSensors`), SLR per time step.
+            proc_slr = self._slr_per_step(self._motion_model, upd_means, upd_covs, upd_tss)
+            meas_slr = self._slr_per_step(self._meas_model, upd_means, upd_covs, upd_tss)
+        proc_As, proc_bs, proc_Omegas = self._linear_params(upd_means, upd_covs, *proc_slr)
+        proc_cov_inv = self._cov_inv(self._motion_model.proc_noise, proc_Omegas, upd_tss)
+
+        meas_As, meas_bs, meas_Lambdas = self._linear_params(upd_means, upd_covs, *meas_slr)
+        meas_cov_inv = self._cov_inv(self._meas_model.meas_noise, meas_Lambdas, upd_tss)
+
+        if upd.all():
+            self.proc_lin = list(zip(proc_As, proc_bs, proc_Omegas))
+            self.meas_lin = list(zip(meas_As, meas_bs, meas_Lambdas))
+        else:
+            self.proc_lin, self.meas_lin = list(self.proc_lin), list(self.meas_lin)
+            for ind, k_ind in enumerate(np.flatnonzero(upd)):
+                self.proc_lin[k_ind] = (proc_As[ind], proc_bs[ind], proc_Omegas[ind])
+                self.meas_lin[k_ind] = (meas_As[ind], meas_bs[ind], meas_Lambdas[ind])
+        self.proc_bar = _replace_rows(self.proc_bar, proc_slr[0], upd)
+        self.proc_cov_inv = _replace_rows(self.proc_cov_inv, proc_cov_inv, upd)
+        self.meas_bar = _replace_rows(self.meas_bar, meas_slr[0], upd)
+        self.meas_cov_inv = _replace_rows(self.meas_cov_inv, meas_cov_inv, upd)
+        self._means, self._covs = means.copy(), covs.copy()
+
+    def _changed_time_steps(self, means, covs):
+        """Mask (K,) of the time steps where (means, covs) differ from the previous update
+
+        Partial updates require time invariant models,
+        since the time steps are not passed on to the batched SLR.
+        """
+        K = means.shape[0]
+        partial_upd = (
+            self._means is not None
+            and self._means.shape == means.shape
+            and self._covs.shape == covs.shape
+            and self._time_invariant
+        )
+        if not partial_upd:
+            return np.ones((K,), dtype=bool)
+        return ~((means == self._means).all(axis=1) & (covs == self._covs).all(axis=(1, 2)))
+
+    def _linear_params(self, means, covs, z_bars, psis, phis):
+        """Linear params. (As, bs, Sigmas), batched over the time steps for time invariant models"""
+        if self._time_invariant:
+            return self._slr.linear_params_from_slr_batch(means, covs, z_bars, psis, phis)
+        lin = [self._slr.linear_params_from_slr(*slr_k) for slr_k in zip(means, covs, z_bars, psis, phis)]
+        As, bs, Sigmas = zip(*lin)
+        return list(As), list(bs), list(Sigmas)
+
+    def _cov_inv(self, noise, lin_err_covs, time_steps):
+        """Inverse covariances (noise(k) + lin_err_cov_k)^-1"""
+        if self._time_invariant:
+            # The (K, D, D) stack is inverted in a single batched call.
+            return np.linalg.inv(np.array([noise(k) for k in time_steps]) + lin_err_covs)
+        # The noise dim. may vary with the time step.
+        return [np.linalg.inv(noise(k) + cov_k) for k, cov_k in zip(time_steps, lin_err_covs)]
+
+    def _slr_per_step(self, model, means, covs, time_steps):
+        """SLR quantities (z_bars, psis, phis) as lists, where the estimate for time step k is mapped with time step k"""
+        slrs = [
+            self._slr.slr(partial(model.map_set, time_step=k), mean_k, cov_k)
+            for k, mean_k, cov_k in zip(time_steps, means, covs)
         ]
-        self.meas_bar = [z_bar for z_bar, _, _ in meas_slr]
+        z_bars, psis, phis = zip(*slrs)
+        return list(z_bars), list(psis), list(phis)
 
     def check_sum(self):
         proc_bar_sum = sum([bar.sum() for bar in self.proc_bar])
@@ -115,3 +276,17 @@ class SlrCache:
     def is_initialized(self):
         # TODO: Full
         return self.proc_lin is not None
+
+
+def _replace_rows(old, new, upd):
+    """Copy of `old` with the rows in the mask `upd` replaced by `new`"""
+    if upd.all():
+        return new
+    replaced = old.copy()
+    replaced[upd] = new
+    return replaced
+
+
+def _time_step_fn(fn, time_step):
+    """Single time step mapping R^(N x n) -> R^(N x m) from a batched mapping `fn(states, time_steps)`"""
+    return lambda states: fn(states[np.newaxis], np.array([time_step]))[0]
@@ -1,8 +1,8 @@
 """Distribution interfaces for SLR"""
 from abc import ABC, abstractmethod
+from typing import Optional, Union
 import logging
 import numpy as np
-from scipy.stats import multivariate_normal as mvn
 from src.analytics import calc_subspace_proj_matrix
 
 
@@ -31,13 +31,51 @@ class Conditional(ABC):
 
 
 class Gaussian(Prior):
-    """Gaussian distribution"""
+    """Gaussian distribution
 
-    def __init__(self):
+    Samples x = x_bar + L z, z ~ N(0, I), where P = L L^T.
+    The Cholesky factor of the most recent covariance is cached,
+    since repeated sampling with the same covariance is common (e.g. in `TruncGauss`).
+
+    The standard normal samples z are kept between calls.
+    With `common_random_numbers` they are only redrawn by `resample` (or when their shape changes),
+    i.e. the same z are used for every call, which reduces the variance between e.g. IPLS iterations.
+
+    Samples are drawn from the global `np.random` state (so that `np.random.seed` applies), unless `rng` is given.
+    """
+
+    def __init__(
+        self,
+        rng: Optional[Union[np.random.Generator, np.random.RandomState]] = None,
+        common_random_numbers: bool = False,
+    ):
         self._log = logging.getLogger(self.__class__.__name__)
+        self._rng = rng if rng is not None else np.random
+        self._common_random_numbers = common_random_numbers
+        self._cached_cov = None
+        self._cached_chol = None
+        self._std_normal = None
 
     def sample(self, x_bar, P, num_samples):
-        return mvn.rvs(mean=x_bar, cov=P, size=num_samples)
+        x_bar = np.atleast_1d(x_bar)
+        L = self._chol(np.atleast_2d(P))
+        return x_bar + self._std_normal_sample(num_samples, x_bar.shape[0]) @ L.T
+
+    def resample(self):
+        """Redraw the common random numbers"""
+        if self._std_normal is not None:
+            self._std_normal = self._rng.standard_normal(self._std_normal.shape)
+
+    def _std_normal_sample(self, num_samples, D_x):
+        if self._std_normal is None or self._std_normal.shape != (num_samples, D_x) or not self._common_random_numbers:
+            self._std_normal = self._rng.standard_normal((num_samples, D_x))
+        return self._std_normal
+
+    def _chol(self, P):
+        if self._cached_cov is None or not np.array_equal(P, self._cached_cov):
+            self._cached_cov = P.copy()
+            self._cached_chol = np.linalg.cholesky(P)
+        return self._cached_chol
 
 
 class ProjectedTruncGauss(Prior):
@@ -68,8 +106,8 @@ class TruncGauss(Prior):
     Note: the mean is also truncated to have mean_c <- el. wise max(mean_c, 0)
     """
 
-    def __init__(self):
-        self._distr = Gaussian()
+    def __init__(self, rng: Optional[Union[np.random.Generator, np.random.RandomState]] = None):
+        self._distr = Gaussian(rng)
 
     def sample(self, num_samples, mean, cov):
         mean *= mean > 0
@@ -17,8 +17,10 @@ class McSlr(Slr):
     def slr(self, fn, mean, cov):
         x_sample, z_sample = self._sample(mean, cov)
         z_bar = self._z_bar(z_sample)
-        psi = self._psi(x_sample, mean, z_sample, z_bar)
-        phi = self._phi(z_sample, z_bar)
+        # Centred once, shared by psi and phi
+        z_diff = z_sample - z_bar
+        psi = self._psi(x_sample, mean, z_diff)
+        phi = self._phi(z_diff)
         return z_bar, psi, phi
 
     def _sample(self, mean, cov):
@@ -40,7 +42,7 @@ class McSlr(Slr):
         """
         return _bar(z_sample)
 
-    def _psi(self, x_sample, x_bar, z_sample, z_bar):
+    def _psi(self, x_sample, x_bar, z_diff):
         """Calc Psi = Cov[x, z]
         Vectorization:
         x_diff.T @ z_diff is a matrix mult with dim's:
@@ -49,19 +51,17 @@ class McSlr(Slr):
 
         Args:
             x_sample (N, D_x)
-            z_sample (N, D_z)
-            z_bar (D_z,)
+            x_bar (D_x,)
+            z_diff (N, D_z): z_sample - z_bar
 
         Returns:
             Psi (D_x, D_z)
         """
         sample_size = x_sample.shape[0]
         x_diff = x_sample - x_bar
-        z_diff = z_sample - z_bar
-        cov = x_diff.T @ z_diff
-        return cov / sample_size
+        return x_diff.T @ z_diff / sample_size
 
-    def _phi(self, z_sample, z_bar):
+    def _phi(self, z_diff):
         """Calc Phi = Cov[z, z]
         Vectorization:
         z_diff.T @ z_diff is a matrix mult with dim's:
@@ -69,14 +69,12 @@ class McSlr(Slr):
         each element in x_i and y_i will be computed.
 
         Args:
-            z_sample (N, D_z)
-            z_bar (D_z,)
+            z_diff (N, D_z): z_sample - z_bar
 
         Returns:
             Psi (D_z, D_z)
         """
-        sample_size = z_sample.shape[0]
-        z_diff = z_sample - z_bar
+        sample_size = z_diff.shape[0]
         return z_diff.T @ z_diff / sample_size
 
 
@@ -16,12 +16,28 @@ class SigmaPointSlr(Slr):
         """
 
         sigma_points, weights = self.gen_sigma_points(mean, cov)
-        transf_sigma_points = fn(sigma_points)
-        z_bar = weighted_avg(transf_sigma_points, weights)
-        psi = weighted_cov(sigma_points, mean, transf_sigma_points, z_bar, weights)
-        phi = weighted_cov(transf_sigma_points, z_bar, transf_sigma_points, z_bar, weights)
+        return _slr_moments(mean, sigma_points, fn(sigma_points), weights)
+
+    def slr_batch(self, fn, means, covs):
+        """Sigma point SLR for a sequence of distributions
+
+        The sigma points and the weighted moments are computed for all time steps at once,
+        and the sigma point sets are mapped with a single call to the batched mapping `fn`.
+        See base class for full docs.
+        """
 
-        return z_bar, psi, phi
+        sigma_points, weights = self.sigma_point_method.gen_sigma_points_batch(means, covs)
+        return _slr_given_sigma_points(fn, means, sigma_points, weights)
+
+    def slr_batch_multi(self, fns, means, covs):
+        """Sigma point SLR for several mappings of the same sequence of distributions
+
+        The sigma points are generated once and shared between the mappings.
+        See base class for full docs.
+        """
+
+        sigma_points, weights = self.sigma_point_method.gen_sigma_points_batch(means, covs)
+        return [_slr_given_sigma_points(fn, means, sigma_points, weights) for fn in fns]
 
     def gen_sigma_points(self, mean, cov):
         return self.sigma_point_method.gen_sigma_points(mean, cov)
@@ -35,6 +51,59 @@ class SigmaPointSlr(Slr):
 
         return z_bar
 
+    def calc_z_bar_batch(self, fn, means, covs):
+        """Sigma point SLR for z_bar only, for a sequence of distributions
+
+        See base class for full docs.
+        """
+
+        sigma_points, weights = self.sigma_point_method.gen_sigma_points_batch(means, covs)
+        transf_sigma_points = fn(sigma_points, np.arange(1, sigma_points.shape[0] + 1))
+        if isinstance(transf_sigma_points, list):
+            return [weights @ transf_sigma_points_k for transf_sigma_points_k in transf_sigma_points]
+        return weights @ transf_sigma_points
+
+
+def _slr_given_sigma_points(fn, means, sigma_points, weights):
+    """SLR quantities z_bar, psi, phi for a sequence of sigma point sets
+
+    Args:
+        fn: batched state mapping fn(states, time_steps), e.g. `Model.map_set_batch`
+        means: R^(K x n)
+        sigma_points: R^(K x N x n)
+        weights: R^(N,)
+
+    Returns:
+        z_bars: R^(K x m)
+        psis: R^(K x n x m)
+        phis: R^(K x m x m)
+        or lists of K per time step arrays, if `fn` returns a list (the output dim. m may vary with the time step).
+    """
+    transf_sigma_points = fn(sigma_points, np.arange(1, sigma_points.shape[0] + 1))
+    if isinstance(transf_sigma_points, list):
+        slrs = [_slr_moments(*args, weights) for args in zip(means, sigma_points, transf_sigma_points)]
+        z_bars, psis, phis = zip(*slrs)
+        return list(z_bars), list(psis), list(phis)
+    z_bars = weights @ transf_sigma_points
+    x_diff = sigma_points - means[:, np.newaxis, :]
+    z_diff = transf_sigma_points - z_bars[:, np.newaxis, :]
+    # Batched matmuls over k, rather than a three operand einsum, which does not dispatch to BLAS.
+    weighted_z_diff = weights[:, np.newaxis] * z_diff
+    psis = np.swapaxes(x_diff, 1, 2) @ weighted_z_diff
+    phis = np.swapaxes(z_diff, 1, 2) @ weighted_z_diff
+
+    return z_bars, psis, phis
+
+
+def _slr_moments(mean, sigma_points, transf_sigma_points, weights):
+    """SLR quantities z_bar, psi, phi for a single set of sigma points and their mapped values"""
+    z_bar = weighted_avg(transf_sigma_points, weights)
+    # Same as `weighted_cov`, but the centred transformed sigma points are shared by psi and phi.
+    z_diff = transf_sigma_points - z_bar
+    psi = (weights * (sigma_points - mean).T) @ z_diff
+    phi = (weights * z_diff.T) @ z_diff
+    return z_bar, psi, phi
+
 
 def weighted_avg(vectors: np.ndarray, weights: np.ndarray) -> np.ndarray:
     """Weighted average
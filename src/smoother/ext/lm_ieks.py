@@ -4,6 +4,7 @@ from src.smoother.ext.eks import Eks
 from src.smoother.base import IteratedSmoother
 from src.filter.ekf import ExtCache
 from src.filter.iekf import Iekf
+from src.filter.base import spd_solve
 
 
 class LmIeks(IteratedSmoother):
@@ -18,6 +19,7 @@ class LmIeks(IteratedSmoother):
         self._lambda = lambda_
         self._nu = nu
         self._cache = ExtCache(self._motion_model, self._meas_model)
+        self._lm_iekf = _LmIekf(self._motion_model, self._meas_model, self._lambda)
 
     def _motion_lin(self, _mean, _cov, time_step):
         return self._cache.motion_lin[time_step - 1]
@@ -32,7 +34,7 @@ class LmIeks(IteratedSmoother):
         current_ms, current_Ps = init_traj
         self._update_estimates(current_ms, current_Ps)
         prev_cost = cost_fn(current_ms)
-        cost_iter = []
+        cost_iter = np.empty(self.num_iter - start_iter + 1)
         for iter_ in range(start_iter, self.num_iter + 1):
             self._log.debug(f"Iter: {iter_}")
             inner_iter = 0
@@ -57,14 +59,15 @@ class LmIeks(IteratedSmoother):
                 self._log.warning(f"No cost improvement for {self._cost_improv_iter_lim} iterations")
             self._update_estimates(current_ms, current_Ps)
             prev_cost = cost
-            cost_iter.append(cost)
+            cost_iter[iter_ - start_iter] = cost
             # _cost = cost(current_ms, measurements, m_1_0, P_1_0, self._motion_model, self._meas_model)
-        return mf, Pf, current_ms, current_Ps, np.array(cost_iter)
+        return mf, Pf, current_ms, current_Ps, cost_iter
 
     def _filter_seq(self, measurements, m_1_0, P_1_0):
-        lm_iekf = _LmIekf(self._motion_model, self._meas_model, self._lambda)
-        lm_iekf._update_estimates(self._current_means, self._current_covs, self._cache)
-        return lm_iekf.filter_seq(measurements, m_1_0, P_1_0)
+        # The filter is only set up when the estimates are updated,
+        # the LM inner trials (rejected iterates) only change the damping.
+        self._lm_iekf.set_lambda(self._lambda)
+        return self._lm_iekf.filter_seq(measurements, m_1_0, P_1_0)
 
     def _update_estimates(self, means, covs):
         """The 'previous estimates' which are used in the current iteration are stored in the smoother instance.
@@ -72,6 +75,7 @@ class LmIeks(IteratedSmoother):
         """
         super()._update_estimates(means, covs)
         self._cache.update(means, None)
+        self._lm_iekf._update_estimates(self._current_means, self._current_covs, self._cache)
 
     def _is_initialised(self):
         return self._cache.is_initialized() and self._current_means is not None
@@ -83,6 +87,9 @@ class _LmIekf(Iekf):
         self._lambda = lambda_
         self._current_means = None
 
+    def set_lambda(self, lambda_):
+        self._lambda = lambda_
+
     def _update(self, y_k, m_k_kminus1, P_k_kminus1, R, linearization, time_step):
         """Filter update step
         Overrides (extends) the ordinary KF update with an extra pseudo-measurement of the previous state
@@ -92,10 +99,16 @@ class _LmIekf(Iekf):
         m_k_k, P_k_k = super()._update(y_k, m_k_kminus1, P_k_kminus1, R, linearization, time_step)
         if self._lambda > 0.0:
             D_x = m_k_kminus1.shape[0]
-            S = P_k_k + 1 / self._lambda * np.eye(D_x)
-            K = P_k_k @ np.linalg.inv(S)
+            # S = P + 1 / lambda * I, without allocating the identity matrix.
+            S = P_k_k.copy()
+            S.flat[:: D_x + 1] += 1 / self._lambda
+            K = spd_solve(S, P_k_k).T
             m_k_K = self._current_means[store_ind, :]
             m_k_k = m_k_k + (K @ (m_k_K - m_k_k)).reshape(m_k_k.shape)
-            P_k_k = P_k_k - K @ S @ K.T
+            # P - K P = P S^-1 (S - P) = K / lambda.
+            # This form avoids the cancellation in P - K P for large lambda (K -> I),
+            # and since P and S = P + 1 / lambda I commute, K is symmetric PSD up to rounding errors.
+            P_k_k = K / self._lambda
+            P_k_k = (P_k_k + P_k_k.T) / 2
 
         return m_k_k, P_k_k
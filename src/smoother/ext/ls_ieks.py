@@ -32,7 +32,8 @@ class LsIeks(IteratedSmoother):
         mf, Pf = init_traj
         self._update_estimates(current_ms, current_Ps)
         prev_cost = cost_fn(current_ms)
-        cost_iter = [prev_cost]
+        cost_iter = np.empty(self.num_iter - start_iter + 2)
+        cost_iter[0] = prev_cost
         self._log.debug(f"Initial cost: {prev_cost}")
         for iter_ in range(start_iter, self.num_iter + 1):
             self._log.debug(f"Iter: {iter_}")
@@ -52,9 +53,9 @@ class LsIeks(IteratedSmoother):
                 self._update_estimates(ls_ms, current_Ps)
                 prev_cost = ls_cost
                 mf = mf + alpha * (current_mf - self._current_means)
-            cost_iter.append(prev_cost)
+            cost_iter[iter_ - start_iter + 1] = prev_cost
             # _cost = cost(current_ms, measurements, m_1_0, P_1_0, self._motion_model, self._meas_model)
-        return mf, Pf, current_ms, current_Ps, np.array(cost_iter)
+        return mf, Pf, current_ms, current_Ps, cost_iter
 
     def _filter_seq(self, measurements, m_1_0, P_1_0):
         iekf = Iekf(self._motion_model, self._meas_model)
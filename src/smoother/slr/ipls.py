@@ -19,6 +19,8 @@ class SigmaPointIpls(IteratedSmoother):
         self._sigma_point_method = sigma_point_method
         self.num_iter = num_iter
         self._cache = SlrCache(self._motion_model, self._meas_model, self._slr)
+        # The filter is reused for all iterations, it is given the current linearisations before every pass.
+        self._iplf = SigmaPointIplf(self._motion_model, self._meas_model, self._sigma_point_method)
 
     def _motion_lin(self, _mean, _cov, time_step):
         return self._cache.proc_lin[time_step - 1]
@@ -35,9 +37,8 @@ class SigmaPointIpls(IteratedSmoother):
         return mf, Pf, ms, Ps, cost
 
     def _filter_seq(self, measurements, m_1_0, P_1_0):
-        iplf = SigmaPointIplf(self._motion_model, self._meas_model, self._sigma_point_method)
-        iplf._update_estimates(self._current_means, self._current_covs, self._cache)
-        return iplf.filter_seq(measurements, m_1_0, P_1_0)
+        self._iplf._update_estimates(self._current_means, self._current_covs, self._cache)
+        return self._iplf.filter_seq(measurements, m_1_0, P_1_0)
 
     def _specialise_cost_fn(self, cost_fn_prototype, params):
         if cost_fn_prototype is not None:
@@ -6,6 +6,7 @@ from src.smoother.base import IteratedSmoother
 from src.filter.prlf import SigmaPointPrLf
 from src.smoother.slr.prls import SigmaPointPrLs
 from src.filter.iplf import SigmaPointIplf
+from src.filter.base import spd_solve
 from src.slr.sigma_points import SigmaPointSlr
 
 
@@ -23,6 +24,8 @@ class SigmaPointLmIpls(IteratedSmoother):
         self._lambda = lambda_
         self._nu = nu
         self._cache = SlrCache(self._motion_model, self._meas_model, self._slr)
+        # The filter is reused for all iterations, it is given the current linearisations before every pass.
+        self._lm_iplf = _LmIplf(self._motion_model, self._meas_model, self._sigma_point_method, self._lambda)
 
     def _motion_lin(self, _mean, _cov, time_step):
         return self._cache.proc_lin[time_step - 1]
@@ -48,7 +51,7 @@ class SigmaPointLmIpls(IteratedSmoother):
         current_ms, current_Ps = init_traj
         # If self.num_iter is too low to enter the iter loop
         mf, Pf = init_traj
-        cost_iter = []
+        cost_iter = np.empty(self.num_iter - start_iter + 1)
         # Optimisation to only update the estimates when the estimates have changed.
         # This method can be called either as part of the filter_and_smooth method,
         # then the estimates are already updated in the _first_iter method,
@@ -100,20 +103,20 @@ class SigmaPointLmIpls(IteratedSmoother):
                 self._log.info(f"No cost improvement for {self._cost_improv_iter_lim} iterations, returning")
                 # Update to get the most recent estimates into the stored_estimates
                 self._update_estimates(self._current_means, self._current_covs)
-                return mf, Pf, self._current_means, self._current_covs, np.array(cost_iter)
+                return mf, Pf, self._current_means, self._current_covs, cost_iter[: iter_ - start_iter]
 
             # Full update, updating means and covs estimates.
             # Which also requires an update of the cost fn.
             self._update_estimates(current_ms, current_Ps)
             cost_fn = self._specialise_cost_fn(cost_fn_prototype, (self._cache.bars(), self._cache.inv_cov()))
             prev_cost = cost_fn(current_ms)
-            cost_iter.append(prev_cost)
-        return mf, Pf, current_ms, current_Ps, np.array(cost_iter)
+            cost_iter[iter_ - start_iter] = prev_cost
+        return mf, Pf, current_ms, current_Ps, cost_iter
 
     def _filter_seq(self, measurements, m_1_0, P_1_0):
-        lm_iplf = _LmIplf(self._motion_model, self._meas_model, self._sigma_point_method, self._lambda)
-        lm_iplf._update_estimates(self._current_means, self._current_covs, self._cache)
-        return lm_iplf.filter_seq(measurements, m_1_0, P_1_0)
+        self._lm_iplf.set_lambda(self._lambda)
+        self._lm_iplf._update_estimates(self._current_means, self._current_covs, self._cache)
+        return self._lm_iplf.filter_seq(measurements, m_1_0, P_1_0)
 
     def _specialise_cost_fn(self, cost_fn_prototype, params):
         (
@@ -160,6 +163,9 @@ class _LmIplf(SigmaPointIplf):
         super().__init__(motion_model, meas_model, sigma_point_method)
         self._lambda = lambda_
 
+    def set_lambda(self, lambda_):
+        self._lambda = lambda_
+
     def _update(self, y_k, m_k_kminus1, P_k_kminus1, R, linearization, time_step):
         """Filter update step
         Overrides (extends) the ordinary KF update with an extra pseudo-measurement of the previous state
@@ -167,12 +173,18 @@ class _LmIplf(SigmaPointIplf):
         """
         store_ind = time_step - 1
         m_k_k, P_k_k = super()._update(y_k, m_k_kminus1, P_k_kminus1, R, linearization, time_step)
-        D_x = m_k_kminus1.shape[0]
         if self._lambda > 0:
-            S = P_k_k + 1 / self._lambda * np.eye(D_x)
-            K = P_k_k @ np.linalg.inv(S)
+            D_x = m_k_kminus1.shape[0]
+            # S = P + 1 / lambda * I, without allocating the identity matrix.
+            S = P_k_k.copy()
+            S.flat[:: D_x + 1] += 1 / self._lambda
+            K = spd_solve(S, P_k_k).T
             m_k_K = self._current_means[store_ind, :]
             m_k_k = m_k_k + (K @ (m_k_K - m_k_k)).reshape(m_k_k.shape)
-            P_k_k = P_k_k - K @ S @ K.T
+            # P - K P = P S^-1 (S - P) = K / lambda.
+            # This form avoids the cancellation in P - K P for large lambda (K -> I),
+            # and since P and S = P + 1 / lambda I commute, K is symmetric PSD up to rounding errors.
+            P_k_k = K / self._lambda
+            P_k_k = (P_k_k + P_k_k.T) / 2
 
         return m_k_k, P_k_k
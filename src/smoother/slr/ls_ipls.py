@@ -22,6 +22,8 @@ class SigmaPointLsIpls(IteratedSmoother):
         self.num_iter = num_iter
         self._ls_method = line_search_method
         self._cache = SlrCache(self._motion_model, self._meas_model, self._slr)
+        # The filter is reused for all iterations, it is given the current linearisations before every pass.
+        self._iplf = SigmaPointIplf(self._motion_model, self._meas_model, self._sigma_point_method)
 
     def _motion_lin(self, _mean, _cov, time_step):
         return self._cache.proc_lin[time_step - 1]
@@ -46,7 +48,7 @@ class SigmaPointLsIpls(IteratedSmoother):
         current_ms, current_Ps = init_traj
         # If self.num_iter is too low to enter the iter loop
         mf, Pf = init_traj
-        cost_iter = []
+        cost_iter = np.empty(self.num_iter - start_iter + 1)
         if not self._is_initialised():
             self._update_estimates(current_ms, current_Ps)
         cost_fn = self._specialise_cost_fn(cost_fn_prototype, (self._current_covs, self._cache.inv_cov()))
@@ -56,15 +58,15 @@ class SigmaPointLsIpls(IteratedSmoother):
             measurements=measurements,
             m_1_0=m_1_0,
             P_1_0=P_1_0,
-            motion_fn=self._motion_model.map_set,
-            meas_fn=self._meas_model.map_set,
+            motion_fn=self._motion_model.map_set_batch,
+            meas_fn=self._meas_model.map_set_batch,
             slr_method=self._slr,
         )
         dir_der = self._specialise_dir_der(dir_der_prototype, (self._current_covs, self._cache.inv_cov()))
         prev_cost = cost_fn(current_ms)
         for iter_ in range(start_iter, self.num_iter + 1):
             self._log.debug(f"Iter: {iter_}")
-            cost_iter.append(prev_cost)
+            cost_iter[iter_ - start_iter] = prev_cost
             num_iter_with_same_cost = 1
             while self._terminate_inner_loop(num_iter_with_same_cost):
                 num_iter_with_same_cost += 1
@@ -92,12 +94,11 @@ class SigmaPointLsIpls(IteratedSmoother):
                 dir_der = self._specialise_dir_der(dir_der_prototype, (self._current_covs, self._cache.inv_cov()))
             self._log.debug(f"Cost: {cost}, alpha: {alpha}")
             cost_fn = self._specialise_cost_fn(cost_fn_prototype, (self._current_covs, self._cache.inv_cov()))
-        return mf, Pf, current_ms, current_Ps, np.array(cost_iter)
+        return mf, Pf, current_ms, current_Ps, cost_iter
 
     def _filter_seq(self, measurements, m_1_0, P_1_0):
-        iplf = SigmaPointIplf(self._motion_model, self._meas_model, self._sigma_point_method)
-        iplf._update_estimates(self._current_means, self._current_covs, self._cache)
-        return iplf.filter_seq(measurements, m_1_0, P_1_0)
+        self._iplf._update_estimates(self._current_means, self._current_covs, self._cache)
+        return self._iplf.filter_seq(measurements, m_1_0, P_1_0)
 
     def _specialise_cost_fn(self, cost_fn_prototype, params):
         (
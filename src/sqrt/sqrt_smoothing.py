@@ -23,7 +23,7 @@ def rts_smoothing(filter_means, filter_covs, pred_means, pred_covs, linearizatio
 
     K = filter_means.shape[0] - 1
     smooth_means, smooth_covs = _init_smooth_estimates(filter_means, filter_covs)
-    for k in np.flip(np.arange(1, K + 1)):
+    for k in range(K, 0, -1):
         linear_params = linearizations[k - 1]
         x_k_K, P_k_K = smooth_means[k, :], smooth_covs[k, :, :]
         x_k_kminus1, P_k_kminus1 = pred_means[k, :], pred_covs[k, :, :]
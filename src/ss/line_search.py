@@ -3,7 +3,7 @@
 Used for debugging
 """
 import numpy as np
-from src.cost import ss_cost
+from src.cost_fn.ext import _ss_cost as ss_cost
 
 
 def ls_ieks(measurements, prior_mean, prior_cov, Q, R, f_fun, df_fun, h_fun, dh_fun, niter, MN0, ngrid):
@@ -106,9 +106,9 @@ from functools import partial
 import numpy as np
 from src.smoother.ext.ls_ieks import LsIeks
 from src.line_search import GridSearch
-from src.cost import analytical_smoothing_cost
+from src.cost_fn.ext import analytical_smoothing_cost
 from src.models.range_bearing import MultiSensorBearings
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import get_specific_states_from_file, Type
 from src.smoother.ext.ls_ieks import LsIeks
 
@@ -117,15 +117,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -2,12 +2,13 @@ from timeit import timeit
 from functools import partial
 from pathlib import Path
 import numpy as np
-from src.cost import slr_smoothing_cost, slr_smoothing_cost_pre_comp
+from scipy.linalg import cho_factor
+from src.cost_fn.slr import slr_smoothing_cost, slr_smoothing_cost_pre_comp
 from src.sigma_points import SphericalCubature
 from src.slr.sigma_points import SigmaPointSlr
 from src.slr.base import SlrCache
 from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import get_specific_states_from_file, Type
 
 
@@ -15,15 +16,7 @@ def main():
     dt = 0.01
     qc = 0.01
     qw = 10
-    Q = np.array(
-        [
-            [qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0, 0],
-            [0, qc * dt ** 3 / 3, 0, qc * dt ** 2 / 2, 0],
-            [qc * dt ** 2 / 2, 0, qc * dt, 0, 0],
-            [0, qc * dt ** 2 / 2, 0, qc * dt, 0],
-            [0, 0, 0, 0, dt * qw],
-        ]
-    )
+    Q = coord_turn_proc_noise(dt, qc, qw)
     motion_model = CoordTurn(dt, Q)
 
     sens_pos_1 = np.array([-1.5, 0.5])
@@ -40,25 +33,21 @@ def main():
     measurements = measurements[:, :2]
     K = measurements.shape[0]
     covs = np.array([prior_cov] * K)
-    slr_cache = SlrCache(motion_model.map_set, meas_model.map_set, SigmaPointSlr(SphericalCubature()))
+    slr_cache = SlrCache(motion_model, meas_model, SigmaPointSlr(SphericalCubature()))
     slr_cache.update(ss_ms, covs)
     new_proto = partial(
         slr_smoothing_cost_pre_comp,
         measurements=measurements,
         m_1_0=prior_mean,
-        P_1_0=prior_cov,
+        P_1_0_chol=cho_factor(prior_cov),
     )
     new = partial(
         new_proto,
         traj=ss_ms,
-        proc_bar=slr_cache.proc_bar,
+        motion_bar=slr_cache.proc_bar,
         meas_bar=slr_cache.meas_bar,
-        proc_cov=np.array(
-            [err_cov_k + motion_model.proc_noise(k) for k, (_, _, err_cov_k) in enumerate(slr_cache.proc_lin)]
-        ),
-        meas_cov=np.array(
-            [err_cov_k + meas_model.meas_noise(k) for k, (_, _, err_cov_k) in enumerate(slr_cache.meas_lin)]
-        ),
+        motion_cov_inv=slr_cache.proc_cov_inv,
+        meas_cov_inv=slr_cache.meas_cov_inv,
     )
     old = partial(
         slr_smoothing_cost,
@@ -7,9 +7,9 @@ Runs EKF and compares with stored matlab output.
 """
 import unittest
 import numpy as np
-from src.filter.ekf import Ekf
-from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.filter.ekf import Ekf, ExtCache, ext_lin
+from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import Type, get_specific_states_from_file
 from pathlib import Path
 
@@ -47,3 +47,39 @@ class TestEkf(unittest.TestCase):
         ekf = Ekf(motion_model, meas_model)
         mf, Pf, _, _ = ekf.filter_seq(measurements, prior_mean, prior_cov)
         self.assertTrue(np.allclose(mf, ss_mf))
+
+    def test_cache_partial_update(self):
+        motion_model = CoordTurn(0.01, coord_turn_proc_noise(0.01, 0.01, 10))
+        meas_model = MultiSensorRange(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        K = 20
+        means = np.random.randn(K, 5)
+        cache = ExtCache(motion_model, meas_model)
+        cache.update(means, None)
+        # The linearisations are lazy, access them before the partial updates
+        _ = cache.motion_lin, cache.meas_lin
+        new_means = means.copy()
+        new_means[[3, 10], :] += 0.1
+        cache.update(new_means, None)
+        new_means[7, :] += 0.1
+        cache.update(new_means, None)
+
+        ref_cache = ExtCache(motion_model, meas_model)
+        ref_cache.update(new_means, None)
+        for lin, ref_lin in zip(cache.motion_lin + cache.meas_lin, ref_cache.motion_lin + ref_cache.meas_lin):
+            self.assertTrue(np.allclose(lin[0], ref_lin[0]))
+            self.assertTrue(np.allclose(lin[1], ref_lin[1]))
+
+    def test_cache_varying_meas_dim(self):
+        motion_model = CoordTurn(0.01, coord_turn_proc_noise(0.01, 0.01, 10))
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-6 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {5, 10})
+        K = 12
+        means = np.random.randn(K, 5)
+        cache = ExtCache(motion_model, meas_model)
+        cache.update(means, None)
+        for k, (lin, mean) in enumerate(zip(cache.meas_lin, means), 1):
+            H, c = ext_lin(meas_model, mean, k)
+            self.assertEqual(lin[0].shape, (1, 5) if k in (5, 10) else (2, 5))
+            self.assertTrue(np.allclose(lin[0], H))
+            self.assertTrue(np.allclose(lin[1], c))
@@ -19,3 +19,12 @@ class TestCoordTurn(unittest.TestCase):
         pred_state = motion_model.map_set(state, None)
         self.assertEqual(pred_state.shape, state.shape)
         self.assertAlmostEqual(pred_state[0, 0], 0)
+
+    def test_jacobian_set(self):
+        sampling_period = 0.1
+        motion_model = CoordTurn(sampling_period, None)
+        states = np.random.randn(10, 5)
+        states[0, 4] = 0.0
+        jacs = motion_model.jacobian_set(states)
+        self.assertEqual(jacs.shape, (10, 5, 5))
+        self.assertTrue(np.allclose(jacs, np.array([motion_model.jacobian(state, None) for state in states])))
@@ -1,6 +1,6 @@
 import unittest
 import numpy as np
-from src.models.range_bearing import RangeBearing
+from src.models.range_bearing import RangeBearing, to_cartesian_coords
 
 
 # TODO: Add numerial test
@@ -23,3 +23,10 @@ class TestRangeBearing(unittest.TestCase):
         meas = meas_model.map_set(state, None)
         self.assertEqual(meas.shape, (10, 2))
         self.assertAlmostEqual(meas[0, 0], np.sqrt(2))
+
+    def test_to_cartesian_coords_list(self):
+        pos = np.array([1.0, -1.0])
+        meas = [np.array([2.0, 0.0]), np.array([1.0, np.pi / 2])]
+        coords = to_cartesian_coords(meas, pos)
+        self.assertTrue(np.allclose(coords, np.array([[3.0, -1.0], [1.0, 0.0]])))
+        self.assertTrue(np.allclose(to_cartesian_coords(meas[0], pos), coords[0]))
@@ -13,3 +13,13 @@ class TestSphericalCubature(unittest.TestCase):
         self.assertEqual(weights.shape, (2 * D_x,))
         self.assertEqual(sp.shape, (2 * D_x, D_x))
         self.assertTrue(np.allclose(sp[0, :], should_be))
+
+    def test_batch_matches_single_state(self):
+        means = np.array([[0.0, 1.0], [2.0, -1.0], [0.5, 0.5]])
+        covs = np.array([2 * np.eye(2), [[2.0, 0.5], [0.5, 1.0]], [[1.0, -0.3], [-0.3, 0.4]]])
+        sp_batch, weights_batch = SphericalCubature().gen_sigma_points_batch(means, covs)
+        self.assertEqual(sp_batch.shape, (3, 4, 2))
+        for sp_batch_k, mean, cov in zip(sp_batch, means, covs):
+            sp, weights = SphericalCubature().gen_sigma_points(mean, cov)
+            self.assertTrue(np.allclose(sp_batch_k, sp))
+            self.assertTrue(np.allclose(weights_batch, weights))
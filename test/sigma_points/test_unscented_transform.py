@@ -12,3 +12,14 @@ class TestUnscentedTransform(unittest.TestCase):
         self.assertEqual(weights.shape, (2 * D_x + 1,))
         self.assertEqual(sp.shape, (2 * D_x + 1, D_x))
         self.assertTrue(np.allclose(sp[0, :], mean))
+
+    def test_batch_matches_single_state(self):
+        means = np.array([[0.0, 1.0], [2.0, -1.0], [0.5, 0.5]])
+        covs = np.array([2 * np.eye(2), [[2.0, 0.5], [0.5, 1.0]], [[1.0, -0.3], [-0.3, 0.4]]])
+        ut = UnscentedTransform(1, 2, 3)
+        sp_batch, weights_batch = ut.gen_sigma_points_batch(means, covs)
+        self.assertEqual(sp_batch.shape, (3, 5, 2))
+        for sp_batch_k, mean, cov in zip(sp_batch, means, covs):
+            sp, weights = ut.gen_sigma_points(mean, cov)
+            self.assertTrue(np.allclose(sp_batch_k, sp))
+            self.assertTrue(np.allclose(weights_batch, weights))
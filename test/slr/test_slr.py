@@ -1,9 +1,13 @@
 import unittest
 from functools import partial
 import numpy as np
-from src.sigma_points import UnscentedTransform
+from src.sigma_points import UnscentedTransform, SphericalCubature
 from src.models.nonstationary_growth import NonStationaryGrowth
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
+from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
 from src.slr.sigma_points import SigmaPointSlr
+from src.slr.base import SlrCache
+from src.slr.distributions import Gaussian
 
 
 class TestSlr(unittest.TestCase):
@@ -22,3 +26,76 @@ class TestSlr(unittest.TestCase):
         self.assertAlmostEqual(A.item(), 0.648364625788135)
         self.assertAlmostEqual(b.item(), 6.106518639999370)
         self.assertAlmostEqual(O.item(), 0.002780297964241)
+
+    def test_cache_partial_update(self):
+        motion_model = CoordTurn(0.01, coord_turn_proc_noise(0.01, 0.01, 10))
+        meas_model = MultiSensorRange(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        K = 20
+        means = np.random.randn(K, 5)
+        covs = np.array([0.1 * np.eye(5)] * K)
+        cache = SlrCache(motion_model, meas_model, SigmaPointSlr(SphericalCubature()))
+        cache.update(means, covs)
+        new_means = means.copy()
+        new_means[[3, 10], :] += 0.1
+        cache.update(new_means, covs)
+
+        ref_cache = SlrCache(motion_model, meas_model, SigmaPointSlr(SphericalCubature()))
+        ref_cache.update(new_means, covs)
+        self.assertTrue(np.allclose(cache.proc_bar, ref_cache.proc_bar))
+        self.assertTrue(np.allclose(cache.meas_bar, ref_cache.meas_bar))
+        self.assertTrue(np.allclose(cache.proc_cov_inv, ref_cache.proc_cov_inv))
+        self.assertTrue(np.allclose(cache.meas_cov_inv, ref_cache.meas_cov_inv))
+        self.assertTrue(np.allclose(cache.error_covs()[0], ref_cache.error_covs()[0]))
+        self.assertTrue(np.allclose(cache.error_covs()[1], ref_cache.error_covs()[1]))
+
+    def test_common_random_numbers(self):
+        cov = np.array([[2.0, 0.3], [0.3, 1.0]])
+        distr = Gaussian(np.random.default_rng(0), common_random_numbers=True)
+        sample = distr.sample(np.zeros(2), cov, 10)
+        self.assertTrue(np.allclose(distr.sample(np.ones(2), cov, 10), sample + 1))
+        distr.resample()
+        self.assertFalse(np.allclose(distr.sample(np.zeros(2), cov, 10), sample))
+
+    def test_gaussian_global_seed(self):
+        cov = np.array([[2.0, 0.3], [0.3, 1.0]])
+        distr = Gaussian()
+        np.random.seed(0)
+        sample = distr.sample(np.zeros(2), cov, 10)
+        np.random.seed(0)
+        self.assertTrue(np.allclose(distr.sample(np.zeros(2), cov, 10), sample))
+
+    def test_batch_varying_meas_dim(self):
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-6 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {2, 4})
+        K = 5
+        means = np.random.randn(K, 5)
+        covs = np.array(K * [np.diag([0.1, 0.1, 1, 1, 1])])
+        slr_ = SigmaPointSlr(SphericalCubature())
+        z_bars, psis, phis = slr_.slr_batch(meas_model.map_set_batch, means, covs)
+        z_bars_only = slr_.calc_z_bar_batch(meas_model.map_set_batch, means, covs)
+        for k, (mean, cov) in enumerate(zip(means, covs), 1):
+            z_bar, psi, phi = slr_.slr(partial(meas_model.map_set, time_step=k), mean, cov)
+            self.assertEqual(z_bars[k - 1].shape, (1,) if k in (2, 4) else (2,))
+            self.assertTrue(np.allclose(z_bars[k - 1], z_bar))
+            self.assertTrue(np.allclose(psis[k - 1], psi))
+            self.assertTrue(np.allclose(phis[k - 1], phi))
+            self.assertTrue(np.allclose(z_bars_only[k - 1], z_bar))
+
+    def test_cache_varying_meas_dim(self):
+        motion_model = CoordTurn(0.01, coord_turn_proc_noise(0.01, 0.01, 10))
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-6 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {2, 4})
+        K = 5
+        means = np.random.randn(K, 5)
+        covs = np.array(K * [np.diag([0.1, 0.1, 1, 1, 1])])
+        slr_ = SigmaPointSlr(SphericalCubature())
+        cache = SlrCache(motion_model, meas_model, slr_)
+        cache.update(means, covs)
+        for k, (mean, cov) in enumerate(zip(means, covs), 1):
+            H, c, Lambda = slr_.linear_params(partial(meas_model.map_set, time_step=k), mean, cov)
+            self.assertEqual(cache.meas_lin[k - 1][0].shape, (1, 5) if k in (2, 4) else (2, 5))
+            self.assertTrue(np.allclose(cache.meas_lin[k - 1][0], H))
+            self.assertTrue(np.allclose(cache.meas_lin[k - 1][1], c))
+            self.assertTrue(np.allclose(cache.meas_cov_inv[k - 1], np.linalg.inv(meas_model.meas_noise(k) + Lambda)))
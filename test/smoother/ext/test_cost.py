@@ -8,9 +8,13 @@ Runs EKS and compares with stored matlab output.
 import unittest
 from pathlib import Path
 import numpy as np
-from src.cost_fn.ext import analytical_smoothing_cost, analytical_smoothing_cost_time_dep
-from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.cost_fn.ext import (
+    analytical_smoothing_cost,
+    analytical_smoothing_cost_time_dep,
+    dir_der_analytical_smoothing_cost,
+)
+from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import get_specific_states_from_file, simulate_data, Type
 
 
@@ -81,3 +85,57 @@ class TestCost(unittest.TestCase):
             analytical_smoothing_cost(states, measurements, prior_mean, prior_cov, motion_model, meas_model),
             analytical_smoothing_cost_time_dep(states, measurements, prior_mean, prior_cov, motion_model, meas_model),
         )
+
+    def test_time_dep_varying_meas_dim(self):
+        dt = 0.01
+        K = 6
+        motion_model = CoordTurn(dt, coord_turn_proc_noise(dt, qc=0.01, qw=10))
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-2 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {2, 5})
+
+        prior_mean = np.array([0, 0, 1, 0, 0])
+        prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
+        traj = prior_mean + 0.1 * np.random.randn(K, 5)
+        measurements = [meas_model.mapping(state, k) + 0.1 for k, state in enumerate(traj, 1)]
+        measurements[3] = np.full((2,), np.nan)
+
+        cost = (traj[0, :] - prior_mean) @ np.linalg.solve(prior_cov, traj[0, :] - prior_mean)
+        for k in range(1, K + 1):
+            if k < K:
+                motion_diff = traj[k, :] - motion_model.mapping(traj[k - 1, :], k)
+                cost += motion_diff @ np.linalg.solve(motion_model.proc_noise(k), motion_diff)
+            if k != 4:
+                meas_diff = measurements[k - 1] - meas_model.mapping(traj[k - 1, :], k)
+                cost += meas_diff @ np.linalg.solve(meas_model.meas_noise(k), meas_diff)
+        self.assertTrue(
+            np.isclose(
+                analytical_smoothing_cost_time_dep(traj, measurements, prior_mean, prior_cov, motion_model, meas_model),
+                cost,
+            )
+        )
+
+    def test_dir_der_varying_meas_dim(self):
+        dt = 0.01
+        K = 6
+        motion_model = CoordTurn(dt, coord_turn_proc_noise(dt, qc=0.01, qw=10))
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-2 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {2, 5})
+
+        prior_mean = np.array([0, 0, 1, 0, 0])
+        prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
+        x_0 = prior_mean + 0.1 * np.random.randn(K, 5)
+        p = 0.1 * np.random.randn(K, 5)
+        measurements = [meas_model.mapping(state, k) + 0.1 for k, state in enumerate(x_0, 1)]
+        measurements[3] = np.full((2,), np.nan)
+
+        args = (measurements, prior_mean, prior_cov, motion_model, meas_model)
+        der = dir_der_analytical_smoothing_cost(x_0, p, *args)
+        # The cost is a sum of quadratic forms without the factor 1/2, hence the extra factor 2 in the central difference.
+        eps = 1e-6
+        fin_diff = (
+            analytical_smoothing_cost_time_dep(x_0 + eps * p, *args)
+            - analytical_smoothing_cost_time_dep(x_0 - eps * p, *args)
+        ) / (4 * eps)
+        self.assertTrue(np.isclose(der, fin_diff, rtol=1e-4))
@@ -10,7 +10,7 @@ from pathlib import Path
 import numpy as np
 from src.smoother.ext.eks import Eks
 from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from data.lm_ieks_paper.coord_turn_example import get_specific_states_from_file, Type
 
 
@@ -48,3 +48,25 @@ class TestEks(unittest.TestCase):
         mf, Pf, ms, Ps, _cost = eks.filter_and_smooth(measurements, prior_mean, prior_cov)
         self.assertTrue(np.allclose(mf, ss_mf))
         self.assertTrue(np.allclose(ms, ss_ms))
+
+    def test_parallel_smoothing(self):
+        dt = 0.01
+        motion_model = CoordTurn(dt, coord_turn_proc_noise(dt, qc=0.01, qw=10))
+
+        sensors = np.array([[-1.5, 0.5], [1, 1]])
+        std = 0.5
+        R = std ** 2 * np.eye(2)
+        meas_model = MultiSensorRange(sensors, R)
+
+        prior_mean = np.array([0, 0, 1, 0, 0])
+        prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
+
+        _, measurements, _, _ = get_specific_states_from_file(Path.cwd() / "data/lm_ieks_paper", Type.Extended, None)
+        measurements = measurements[:, :2]
+        eks = Eks(motion_model, meas_model)
+        mf, Pf, ms, Ps, _ = eks.filter_and_smooth(measurements, prior_mean, prior_cov)
+        eks.parallel_rts = True
+        par_mf, par_Pf, par_ms, par_Ps, _ = eks.filter_and_smooth(measurements, prior_mean, prior_cov)
+        self.assertTrue(np.allclose(par_mf, mf))
+        self.assertTrue(np.allclose(par_ms, ms))
+        self.assertTrue(np.allclose(par_Ps, Ps))
@@ -9,9 +9,10 @@ import unittest
 from pathlib import Path
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 from src.cost_fn.slr import slr_smoothing_cost, slr_smoothing_cost_pre_comp, slr_smoothing_cost_means
-from src.models.range_bearing import MultiSensorRange
-from src.models.coord_turn import CoordTurn
+from src.models.range_bearing import MultiSensorRange, MultiSensorBearings, BearingsVaryingSensors
+from src.models.coord_turn import CoordTurn, coord_turn_proc_noise
 from src.slr.base import SlrCache
 from src.slr.sigma_points import SigmaPointSlr
 from src.sigma_points import SphericalCubature
@@ -54,7 +55,7 @@ class TestCost(unittest.TestCase):
             slr_smoothing_cost_pre_comp,
             measurements=measurements,
             m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
+            P_1_0_chol=cho_factor(prior_cov),
         )
 
         on_the_fly = partial(
@@ -74,10 +75,10 @@ class TestCost(unittest.TestCase):
             slr_smoothing_cost_means,
             measurements=measurements,
             m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
+            P_1_0_chol=cho_factor(prior_cov),
             estimated_covs=covs,
-            motion_fn=motion_model.map_set,
-            meas_fn=meas_model.map_set,
+            motion_fn=motion_model.map_set_batch,
+            meas_fn=meas_model.map_set_batch,
             slr_method=SigmaPointSlr(SphericalCubature()),
         )
         varying_means = partial(
@@ -115,3 +116,51 @@ class TestCost(unittest.TestCase):
 
         self.assertAlmostEqual(pre_comp(ss_ms), on_the_fly(ss_ms))
         self.assertAlmostEqual(pre_comp(ss_ms), varying_means(ss_ms))
+
+    def test_varying_meas_dim(self):
+        dt = 0.01
+        K = 6
+        motion_model = CoordTurn(dt, coord_turn_proc_noise(dt, qc=0.01, qw=10))
+        double_meas_model = MultiSensorBearings(np.array([[-1.5, 0.5], [1, 1]]), 0.25 * np.eye(2))
+        single_meas_model = MultiSensorBearings(np.array([[1, 1]]), 1e-2 * np.eye(1))
+        meas_model = BearingsVaryingSensors(double_meas_model, single_meas_model, {2, 5})
+
+        prior_mean = np.array([0, 0, 1, 0, 0])
+        prior_cov = np.diag([0.1, 0.1, 1, 1, 1])
+        traj = prior_mean + 0.1 * np.random.randn(K, 5)
+        covs = np.array(K * [prior_cov])
+        measurements = [meas_model.mapping(state, k) + 0.1 for k, state in enumerate(traj, 1)]
+        measurements[3] = np.full((2,), np.nan)
+
+        slr = SigmaPointSlr(SphericalCubature())
+        slr_cache = SlrCache(motion_model, meas_model, slr)
+        slr_cache.update(traj, covs)
+        cost = slr_smoothing_cost_pre_comp(
+            traj, measurements, prior_mean, cho_factor(prior_cov), *slr_cache.bars(), *slr_cache.inv_cov()
+        )
+
+        motion_bar, meas_bar = slr_cache.bars()
+        motion_cov_inv, meas_cov_inv = slr_cache.inv_cov()
+        ref_cost = (traj[0, :] - prior_mean) @ np.linalg.solve(prior_cov, traj[0, :] - prior_mean)
+        for k_ind in range(K):
+            if k_ind < K - 1:
+                motion_diff = traj[k_ind + 1, :] - motion_bar[k_ind]
+                ref_cost += motion_diff @ motion_cov_inv[k_ind] @ motion_diff
+            if k_ind != 3:
+                meas_diff = measurements[k_ind] - meas_bar[k_ind]
+                ref_cost += meas_diff @ meas_cov_inv[k_ind] @ meas_diff
+        self.assertTrue(np.isclose(cost, ref_cost))
+
+        means_cost = slr_smoothing_cost_means(
+            traj,
+            measurements,
+            prior_mean,
+            cho_factor(prior_cov),
+            covs,
+            motion_model.map_set_batch,
+            meas_model.map_set_batch,
+            motion_cov_inv,
+            meas_cov_inv,
+            slr,
+        )
+        self.assertTrue(np.isclose(means_cost, cost))
@@ -8,6 +8,7 @@ Runs (GN-)IPLS and compares with stored matlab output.
 import unittest
 from functools import partial
 import numpy as np
+from scipy.linalg import cho_factor
 from src.utils import setup_logger
 from src.smoother.slr.ipls import SigmaPointIpls
 from src.smoother.slr.lm_ipls import SigmaPointLmIpls
@@ -53,7 +54,7 @@ class TestLmIpls(unittest.TestCase):
             slr_smoothing_cost_pre_comp,
             measurements=measurements,
             m_1_0=prior_mean,
-            P_1_0_inv=np.linalg.inv(prior_cov),
+            P_1_0_chol=cho_factor(prior_cov),
         )
 
         ipls = SigmaPointIpls(motion_model, meas_model, sigma_point_method, num_iter)